@@ -0,0 +1,46 @@
+import numpy as np
+import constants
+
+class ActivityScheduler():
+  def __init__(self, mob_activity):
+    self.frame = 0
+    #wake radius and tick rate looked up by enemy type, mob_activity is the asset pack's list of them
+    self.wake_radius = np.array([wake_radius for wake_radius, tick_rate in mob_activity], dtype = np.int64)
+    self.tick_rate = np.array([tick_rate for wake_radius, tick_rate in mob_activity], dtype = np.int64)
+
+  def active(self, enemy_list, player, camera):
+    #return the enemies that should run their ai and update this frame, each with the frames its tick covers
+    rows, steps = self.active_rows(enemy_list, player, camera)
+    return [(enemy_list[i], step) for i, step in zip(rows.tolist(), steps.tolist())]
+
+  def active_rows(self, enemy_list, player, camera):
+    #the same as active but as row numbers in enemy_list, which is the level's EntityStore, and an array of steps
+    #enemies that only tick every few frames cover all the frames since their last tick, so they move at the same speed
+    self.frame += 1
+    if not enemy_list:
+      return np.zeros(0, dtype = np.int64), np.zeros(0, dtype = np.int64)
+    char_type = enemy_list.column("char_type")
+    wake_radius = self.wake_radius[char_type]
+    tick_rate = self.tick_rate[char_type]
+
+    #far enemies stay dormant until the player comes within their wake radius
+    awake = enemy_list.column("awake")
+    centerx, centery = enemy_list.centers()
+    player_x, player_y = player.rect.center
+    dist_x = centerx.astype(np.int64) - player_x
+    dist_y = centery.astype(np.int64) - player_y
+    woken = (enemy_list.column("alive") != 0) & ((awake != 0) | (dist_x * dist_x + dist_y * dist_y <= wake_radius * wake_radius))
+    #an enemy that has just woken up only covers this frame
+    last_tick = enemy_list.column("last_tick")
+    last_tick[woken & (awake == 0)] = self.frame - 1
+    awake[woken] = 1
+
+    #enemies near the screen tick every frame, the rest are staggered so they don't all tick together
+    left, top, right, bottom = enemy_list.rects()
+    near = ((right > camera.x - constants.ACTIVITY_MARGIN) & (left < camera.x + constants.SCREEN_WIDTH + constants.ACTIVITY_MARGIN)
+      & (bottom > camera.y - constants.ACTIVITY_MARGIN) & (top < camera.y + constants.SCREEN_HEIGHT + constants.ACTIVITY_MARGIN))
+    ticking = near | ((self.frame + np.arange(len(enemy_list))) % tick_rate == 0)
+    rows = np.flatnonzero(woken & ticking)
+    steps = self.frame - last_tick[rows]
+    last_tick[rows] = self.frame
+    return rows, steps
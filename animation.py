@@ -0,0 +1,36 @@
+import game_clock
+import constants
+
+class AnimationTrack():
+  #a frame counter shared by every sprite animating at the same speed
+  def __init__(self, name, cooldown):
+    self.name = name
+    self.cooldown = cooldown
+    self.reset()
+
+  def reset(self):
+    self.frame = 0
+    self.update_time = game_clock.get_ticks()
+
+  def update(self):
+    #check if enough time has passed since the last update
+    if game_clock.get_ticks() - self.update_time > self.cooldown:
+      self.frame += 1
+      self.update_time = game_clock.get_ticks()
+
+
+class AnimationScheduler():
+  #advances every named track once per frame, sprites hold a track and the track frame their animation started on
+  def __init__(self, tracks = constants.ANIMATION_TRACKS):
+    self.tracks = {name: AnimationTrack(name, cooldown) for name, cooldown in tracks.items()}
+
+  def track(self, name):
+    return self.tracks[name]
+
+  def update(self):
+    for track in self.tracks.values():
+      track.update()
+
+  def reset(self):
+    for track in self.tracks.values():
+      track.reset()
@@ -0,0 +1,140 @@
+import json
+import pygame
+import constants
+
+def setting(value):
+  #manifest numbers can be given directly or as the name of a value in constants
+  if isinstance(value, str):
+    return getattr(constants, value)
+  return value
+
+class TextureAtlas():
+  def __init__(self, size, padding = 1):
+    self.size = size
+    self.padding = padding
+    self.pages = []
+    self.index = {}#name: (page number, rect)
+
+  def new_page(self, width, height):
+    page = pygame.Surface((max(width, self.size), max(height, self.size)), pygame.SRCALPHA)
+    self.pages.append(page)
+    #shelf packing state for the page: x and y of the next slot and the height of the current shelf
+    self.shelf = [0, 0, 0]
+
+  def add(self, name, image):
+    width = image.get_width() + self.padding
+    height = image.get_height() + self.padding
+    if not self.pages:
+      self.new_page(width, height)
+    page = self.pages[-1]
+    x, y, shelf_height = self.shelf
+    #start a new shelf when the row is full, and a new page when the page is full
+    if x + width > page.get_width():
+      x, y, shelf_height = 0, y + shelf_height, 0
+    if x + width > page.get_width() or y + height > page.get_height():
+      self.new_page(width, height)
+      page = self.pages[-1]
+      x, y, shelf_height = 0, 0, 0
+    page.blit(image, (x, y))
+    rect = pygame.Rect(x, y, image.get_width(), image.get_height())
+    self.index[name] = (len(self.pages) - 1, rect)
+    self.shelf = [x + width, y, max(shelf_height, height)]
+
+  def finish(self):
+    #convert the pages to the display format when there is a display to match
+    if pygame.display.get_surface() is not None:
+      self.pages = [page.convert_alpha() for page in self.pages]
+
+  def get(self, name):
+    page, rect = self.index[name]
+    return self.pages[page].subsurface(rect)
+
+
+class AssetPack():
+  def __init__(self, manifest_path = "assets/manifest.json"):
+    with open(manifest_path) as manifest_file:
+      self.manifest = json.load(manifest_file)
+    self.atlas = TextureAtlas(self.manifest["atlas_size"])
+    self.images = {}
+    self.animations = {}
+    self.tile_list = []
+    self.mob_types = []
+    self.mob_animations = []
+    #level tile id: (mob type index, health, boss, size) for the tiles that spawn an enemy
+    self.mob_spawns = {}
+    #(wake radius in pixels, frames between ticks while awake but off screen) for each mob type
+    #types the manifest doesn't list use its default
+    self.mob_activity = []
+    self.load()
+
+  def load_image(self, path, scale):
+    image = pygame.image.load(path)
+    w = image.get_width()
+    h = image.get_height()
+    return pygame.transform.scale(image, (w * scale, h * scale))
+
+  def load(self):
+    #load and scale every sprite in the manifest into the atlas
+    for name, entry in self.manifest["images"].items():
+      self.atlas.add(name, self.load_image(entry["path"], setting(entry["scale"])))
+
+    for name, entry in self.manifest["animations"].items():
+      for frame in range(entry["frames"]):
+        image = self.load_image(entry["path"].format(frame = frame), setting(entry["scale"]))
+        self.atlas.add(f"{name}/{frame}", image)
+
+    tiles = self.manifest["tiles"]
+    size = setting(tiles["size"])
+    for index in range(setting(tiles["count"])):
+      image = pygame.transform.scale(pygame.image.load(tiles["path"].format(index = index)), (size, size))
+      self.atlas.add(f"tiles/{index}", image)
+
+    mobs = self.manifest["mobs"]
+    for mob in mobs["types"]:
+      for animation in mobs["animations"]:
+        for frame in range(mobs["frames"]):
+          image = self.load_image(mobs["path"].format(mob = mob, animation = animation, frame = frame), setting(mobs["scale"]))
+          self.atlas.add(f"{mob}/{animation}/{frame}", image)
+          #mirror every frame once here so characters facing left don't flip images each frame
+          self.atlas.add(f"{mob}/{animation}/{frame}/flipped", pygame.transform.flip(image, True, False))
+    self.atlas.finish()
+
+    #build the lookups from the finished atlas pages
+    for name in self.manifest["images"]:
+      self.images[name] = self.atlas.get(name)
+    for name, entry in self.manifest["animations"].items():
+      self.animations[name] = [self.atlas.get(f"{name}/{frame}") for frame in range(entry["frames"])]
+    self.tile_list = [self.atlas.get(f"tiles/{index}") for index in range(setting(tiles["count"]))]
+    self.mob_types = list(mobs["types"])
+    for mob in self.mob_types:
+      animation_list = []
+      flipped_list = []
+      for animation in mobs["animations"]:
+        animation_list.append([self.atlas.get(f"{mob}/{animation}/{frame}") for frame in range(mobs["frames"])])
+        flipped_list.append([self.atlas.get(f"{mob}/{animation}/{frame}/flipped") for frame in range(mobs["frames"])])
+      self.mob_animations.append([animation_list, flipped_list])
+    for tile, spawn in mobs["spawns"].items():
+      self.mob_spawns[int(tile)] = (self.mob_types.index(spawn["type"]), spawn["health"], spawn.get("boss", False), spawn.get("size", 1))
+    activity = mobs["activity"]
+    for mob in self.mob_types:
+      wake_radius, tick_rate = activity.get(mob, activity["default"])
+      self.mob_activity.append((setting(wake_radius), setting(tick_rate)))
+
+  def image(self, name):
+    return self.images[name]
+
+  def animation(self, name):
+    return self.animations[name]
+
+  def mob_spawn(self, tile):
+    #the enemy a level tile spawns as (mob type index, health, boss, size), or None
+    #health is looked up each time as it can name a balance constant that batch_sim overrides
+    spawn = self.mob_spawns.get(tile)
+    if spawn is None:
+      return None
+    char_type, health, boss, size = spawn
+    return char_type, setting(health), boss, size
+
+  def item_images(self):
+    #images for each item type, indexed by Item.item_type
+    return [self.animation("coin"), self.image("potion_red")]
@@ -0,0 +1,125 @@
+import math
+import numpy as np
+import pygame
+import constants
+import game_clock
+import weapon
+
+def batch_ai(enemies, rows, player, tile_grid, flow_field, fireball_rotations, steps = None):
+  #run ai and update for the given rows of the enemy store together, returns any fireballs shot
+  #steps are the frames each row's tick covers, as passed to Character.ai
+  #gives the same results as calling ai then update on each enemy in turn
+  fireballs = []
+  if len(rows) == 0:
+    return fireballs
+  columns = enemies.columns
+  now = game_clock.get_ticks()
+  rows = np.asarray(rows)
+  speed = constants.ENEMY_SPEED * (np.ones(len(rows), dtype = np.int64) if steps is None else np.asarray(steps))
+  centerx, centery = enemies.centers()
+  centerx = centerx[rows].astype(np.int64)
+  centery = centery[rows].astype(np.int64)
+  player_x, player_y = player.rect.center
+
+  #check distance to player
+  dist = np.sqrt((centerx - player_x) ** 2 + (centery - player_y) ** 2)
+
+  #check if the line of sight from each enemy to the player passes through an obstacle tile
+  line_of_sight = np.array([tile_grid.line_of_sight((x, y), (player_x, player_y), constants.LOS_CACHE)
+    for x, y in zip(centerx.tolist(), centery.tolist())], dtype = bool)
+
+  #enemies that can see the player run straight at it until in range
+  chase = line_of_sight & (dist > constants.RANGE)
+  ai_dx = np.where(chase, np.sign(player_x - centerx) * speed, 0)
+  ai_dy = np.where(chase, np.sign(player_y - centery) * speed, 0)
+  #the rest follow the flow field around the walls, heading for the centre of the next cell without overshooting it
+  for i in np.flatnonzero(~line_of_sight).tolist():
+    next_cell = flow_field.direction(pygame.Rect(columns["x"][rows[i]], columns["y"][rows[i]], columns["width"][rows[i]], columns["height"][rows[i]]))
+    if next_cell:
+      step_speed = int(speed[i])
+      ai_dx[i] = max(-step_speed, min(step_speed, next_cell[0] * constants.TILE_SIZE - int(centerx[i])))
+      ai_dy[i] = max(-step_speed, min(step_speed, next_cell[1] * constants.TILE_SIZE - int(centery[i])))
+
+  alive = enemies.column("alive")[rows] != 0
+  movers = alive & (enemies.column("stunned")[rows] == 0)
+
+  #move towards player, collisions are resolved one enemy at a time exactly as Character.move does
+  running = enemies.column("running")
+  flip = enemies.column("flip")
+  mover_rows = rows[movers]
+  running[mover_rows] = (ai_dx[movers] != 0) | (ai_dy[movers] != 0)
+  flip[mover_rows[ai_dx[movers] < 0]] = 1
+  flip[mover_rows[ai_dx[movers] > 0]] = 0
+  for i in np.flatnonzero(movers & ((ai_dx != 0) | (ai_dy != 0))).tolist():
+    row = int(rows[i])
+    dx = int(ai_dx[i])
+    dy = int(ai_dy[i])
+    #control diagonal speed
+    if dx != 0 and dy != 0:
+      dx = dx * (math.sqrt(2)/2)
+      dy = dy * (math.sqrt(2)/2)
+    rect = pygame.Rect(columns["x"][row], columns["y"][row], columns["width"][row], columns["height"][row])
+    rect.x += dx
+    tile_grid.push_out_x(rect, dx)
+    rect.y += dy
+    tile_grid.push_out_y(rect, dy)
+    columns["x"][row], columns["y"][row] = rect.topleft
+
+  #attack player, only one hit can land until the player recovers
+  if not player.hit and (movers & (dist < constants.ATTACK_RANGE)).any():
+    player.health -= constants.ATTACK_DAMAGE
+    player.hit = True
+    player.last_hit = now
+
+  #boss enemies shoot fireballs from where they moved to
+  last_attack = enemies.column("last_attack")
+  shooters = movers & (enemies.column("boss")[rows] != 0) & (dist < constants.FIREBALL_RANGE) & (now - last_attack[rows] >= constants.FIREBALL_COOLDOWN)
+  for row in rows[shooters].tolist():
+    rect = pygame.Rect(columns["x"][row], columns["y"][row], columns["width"][row], columns["height"][row])
+    fireballs.append(weapon.Fireball(fireball_rotations, rect.centerx, rect.centery, player_x, player_y))
+    last_attack[row] = now
+
+  #check if hit, a hit enemy is stunned and goes idle
+  hit = enemies.column("hit")
+  last_hit = enemies.column("last_hit")
+  hit_rows = rows[alive & (hit[rows] != 0)]
+  hit[hit_rows] = 0
+  last_hit[hit_rows] = now
+  enemies.column("stunned")[hit_rows] = 1
+  running[hit_rows] = 0
+  set_actions(enemies, hit_rows, 0)
+  stunned = enemies.column("stunned")
+  stunned[rows[alive & (now - last_hit[rows] > constants.STUN_COOLDOWN)]] = 0
+
+  #update the living enemies, checking if they have died
+  update_rows = rows[alive]
+  health = enemies.column("health")
+  died = update_rows[health[update_rows] <= 0]
+  health[died] = 0
+  enemies.column("alive")[died] = 0
+  #pick the action from whether they are running
+  running_rows = running[update_rows] != 0
+  set_actions(enemies, update_rows[running_rows], 1)
+  set_actions(enemies, update_rows[~running_rows], 0)
+  #update images, picking the mirrored frame when facing left
+  flip = columns["flip"]
+  action = columns["action"]
+  phase = columns["phase"]
+  images = enemies.images
+  for row in update_rows.tolist():
+    track = enemies.tracks[row]
+    if track is not None:
+      frames = enemies.animation_lists[row][flip[row]][action[row]]
+      images[row] = frames[(track.frame - phase[row]) % len(frames)]
+  return fireballs
+
+def set_actions(enemies, rows, new_action):
+  #switch rows to a new action, restarting the animation of any that change
+  action = enemies.column("action")
+  changed = rows[action[rows] != new_action]
+  action[changed] = new_action
+  phase = enemies.columns["phase"]
+  for row in changed.tolist():
+    track = enemies.tracks[row]
+    if track is not None:
+      phase[row] = track.frame
@@ -0,0 +1,160 @@
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import time
+import constants
+import game_clock
+import level_loader
+from asset_pack import AssetPack
+from engine import Game
+from simulate import POLICIES
+
+#balance constants --params may override, these are all read from constants when used
+#others like FPS, ROTATION_STEPS or ANIMATION_TRACKS are bound when modules are imported, so overriding them would do nothing
+TUNABLE = (
+  "SPEED", "ENEMY_SPEED", "ARROW_SPEED", "FIREBALL_SPEED",
+  "PLAYER_HEALTH", "ENEMY_HEALTH", "BOSS_HEALTH", "POTION_HEAL",
+  "RANGE", "ATTACK_RANGE", "ATTACK_DAMAGE", "STUN_COOLDOWN",
+  "FIREBALL_RANGE", "FIREBALL_COOLDOWN", "FLOW_FIELD_RANGE",
+)
+
+#sprites are loaded once per worker process
+assets = None
+
+def init_worker():
+  global assets
+  assets = AssetPack()
+
+def play_level(job):
+  #play one level headless until it is cleared, the player dies or the ticks run out
+  level, policy, seed, max_ticks, params_name, params = job
+  #constants are read when used, so a parameter set is applied by overriding them for this run only
+  original = {name: getattr(constants, name) for name in params}
+  for name, value in params.items():
+    setattr(constants, name, value)
+  random.seed(seed)
+  clock = game_clock.FixedClock(1000 / constants.FPS)
+  game_clock.set_source(clock)
+  try:
+    game = Game(assets, level, prefetch = False, render = False)
+    player_policy = POLICIES[policy](seed)
+    health = game.player.health
+    damage_taken = 0
+    cleared = False
+    tick = 0
+    while tick < max_ticks and game.player.alive:
+      cleared = game.step(player_policy(game, tick))
+      clock.advance()
+      tick += 1
+      #potions heal, so only count health going down
+      damage_taken += max(0, health - game.player.health)
+      health = game.player.health
+      if cleared:
+        break
+    return {
+      "params": params_name,
+      "level": level,
+      "policy": policy,
+      "seed": seed,
+      "cleared": cleared,
+      "died": not game.player.alive,
+      "ticks": tick,
+      "damage_taken": damage_taken,
+      "coins": game.player.score,
+    }
+  finally:
+    game_clock.reset()
+    for name, value in original.items():
+      setattr(constants, name, value)
+
+def summarise(results):
+  #win rate, time to clear, damage taken and coins collected per parameter set, level and policy
+  groups = {}
+  for result in results:
+    groups.setdefault((result["params"], result["level"], result["policy"]), []).append(result)
+  report = []
+  for (params_name, level, policy), runs in sorted(groups.items()):
+    clear_times = [run["ticks"] / constants.FPS for run in runs if run["cleared"]]
+    report.append({
+      "params": params_name,
+      "level": level,
+      "policy": policy,
+      "runs": len(runs),
+      "win_rate": len(clear_times) / len(runs),
+      "death_rate": sum(run["died"] for run in runs) / len(runs),
+      "clear_seconds_mean": statistics.mean(clear_times) if clear_times else None,
+      "clear_seconds_median": statistics.median(clear_times) if clear_times else None,
+      "damage_taken_mean": statistics.mean(run["damage_taken"] for run in runs),
+      "coins_mean": statistics.mean(run["coins"] for run in runs),
+    })
+  return report
+
+def parse_params(text):
+  #"ENEMY_SPEED=3 ATTACK_RANGE=50" -> {"ENEMY_SPEED": 3, "ATTACK_RANGE": 50}
+  params = {}
+  for assignment in text.split():
+    name, _, value = assignment.partition("=")
+    if name not in TUNABLE:
+      raise argparse.ArgumentTypeError(f"{name} can't be overridden, choose from {', '.join(TUNABLE)}")
+    try:
+      params[name] = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+      raise argparse.ArgumentTypeError(f"bad value for {name}: {value}")
+  return params
+
+def main():
+  parser = argparse.ArgumentParser(description = "Play many headless games in parallel and report balance statistics")
+  parser.add_argument("--runs", type = int, default = 20, help = "playthroughs per level, policy and parameter set")
+  parser.add_argument("--level", type = int, action = "append", help = "level to play, can be repeated, defaults to every level")
+  parser.add_argument("--policy", action = "append", choices = sorted(POLICIES), help = "player policy, can be repeated, defaults to exit")
+  parser.add_argument("--params", type = parse_params, action = "append", default = [],
+    help = "balance constants to override, e.g. \"ENEMY_SPEED=3 ATTACK_RANGE=50\", can be repeated, the defaults are always run too")
+  parser.add_argument("--ticks", type = int, default = constants.FPS * 180, help = "give up on a level after this many ticks")
+  parser.add_argument("--seed", type = int, default = 0)
+  parser.add_argument("--workers", type = int, default = os.cpu_count())
+  parser.add_argument("--output", help = "write the JSON report to this file instead of stdout")
+  args = parser.parse_args()
+
+  levels = args.level
+  if not levels:
+    levels = []
+    while level_loader.level_exists(len(levels) + 1):
+      levels.append(len(levels) + 1)
+  #compile the level caches up front so the workers only read them
+  for level in levels:
+    level_loader.load_level(level)
+
+  param_sets = [("defaults", {})] + [(" ".join(f"{name}={value!r}" for name, value in params.items()), params) for params in args.params]
+  jobs = [(level, policy, args.seed + run, args.ticks, params_name, params)
+    for params_name, params in param_sets
+    for level in levels
+    for policy in args.policy or ["exit"]
+    for run in range(args.runs)]
+
+  start = time.perf_counter()
+  #start fresh interpreters rather than forking this one
+  context = multiprocessing.get_context("spawn")
+  with context.Pool(args.workers, initializer = init_worker) as pool:
+    results = list(pool.imap_unordered(play_level, jobs, chunksize = max(1, len(jobs) // (args.workers * 8))))
+  elapsed = time.perf_counter() - start
+
+  report = {
+    "playthroughs": len(results),
+    "workers": args.workers,
+    "seconds": elapsed,
+    "ticks_per_second": sum(result["ticks"] for result in results) / elapsed if elapsed > 0 else 0,
+    "summary": summarise(results),
+  }
+  output = json.dumps(report, indent = 2)
+  if args.output:
+    with open(args.output, "w") as report_file:
+      report_file.write(output + "\n")
+  else:
+    print(output)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,186 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+import numpy as np
+import constants
+import game_clock
+import weapon
+from asset_pack import AssetPack
+from engine import Game
+from world import World
+from simulate import WanderPolicy
+
+#tile ids used in the level files
+FLOOR = 0
+WALL = 7
+EXIT = 8
+COIN = 9
+PLAYER = 11
+ENEMY_TYPES = [12, 13, 14, 15, 16]
+BOSS = 17
+
+#each stage is a Game method timed separately every frame, in the order the game runs them
+STAGES = ["move_player", "update_world", "update_enemies", "update_player", "update_projectiles", "update_items", "draw"]
+
+#synthetic stress scenarios: map size and layout plus how much of everything to spawn
+SCENARIOS = {
+  "open_large": {"size": 300},
+  "maze": {"size": 151, "maze": True, "enemies": 100},
+  "enemies_10": {"size": 150, "enemies": 10},
+  "enemies_100": {"size": 150, "enemies": 100},
+  "enemies_1000": {"size": 150, "enemies": 1000},
+  "arrows": {"size": 150, "enemies": 10, "arrows": 500},
+  "boss_fireballs": {"size": 150, "boss": True, "fireballs": 300},
+  "coins": {"size": 150, "coins": 5000},
+}
+
+def build_map(rng, size, maze = False, enemies = 0, boss = False, coins = 0, **spawns):
+  #walled map with the player in the middle, either open floor or a maze of one tile corridors
+  data = [[WALL] * size for _ in range(size)]
+  if maze:
+    #carve a maze with a depth first search over the odd cells
+    stack = [(1, 1)]
+    data[1][1] = FLOOR
+    while stack:
+      x, y = stack[-1]
+      options = [(x + dx, y + dy, dx, dy) for dx, dy in [(2, 0), (-2, 0), (0, 2), (0, -2)]
+        if 0 < x + dx < size - 1 and 0 < y + dy < size - 1 and data[y + dy][x + dx] == WALL]
+      if options:
+        next_x, next_y, dx, dy = rng.choice(options)
+        data[y + dy // 2][x + dx // 2] = FLOOR
+        data[next_y][next_x] = FLOOR
+        stack.append((next_x, next_y))
+      else:
+        stack.pop()
+  else:
+    for y in range(1, size - 1):
+      for x in range(1, size - 1):
+        data[y][x] = FLOOR
+
+  centre = size // 2 | 1
+  data[centre][centre] = PLAYER
+  data[1][1] = EXIT
+  #spread spawns over free floor near the player so they are actually simulated
+  floor = [(x, y) for y in range(size) for x in range(size)
+    if data[y][x] == FLOOR and abs(x - centre) + abs(y - centre) < 40]
+  rng.shuffle(floor)
+  if boss:
+    x, y = floor.pop()
+    data[y][x] = BOSS
+  for _ in range(min(enemies, len(floor))):
+    x, y = floor.pop()
+    data[y][x] = rng.choice(ENEMY_TYPES)
+  #coins go anywhere on the map
+  floor = [(x, y) for y in range(size) for x in range(size) if data[y][x] == FLOOR]
+  rng.shuffle(floor)
+  for _ in range(min(coins, len(floor))):
+    x, y = floor.pop()
+    data[y][x] = COIN
+  return data
+
+def top_up_projectiles(game, rng, arrows, fireballs):
+  #keep the projectile counts up as shots leave the screen
+  player = game.player
+  while len(game.arrow_group) < arrows:
+    game.arrow_group.add(weapon.Arrow(game.bow.arrow_rotations, player.rect.centerx, player.rect.centery, rng.uniform(0, 360)))
+  while len(game.fireball_group) < fireballs:
+    angle = rng.uniform(0, math.tau)
+    x = player.rect.centerx + math.cos(angle) * 350
+    y = player.rect.centery + math.sin(angle) * 250
+    game.fireball_group.add(weapon.Fireball(game.fireball_rotations, x, y, player.rect.centerx, player.rect.centery))
+
+def percentiles(samples):
+  times = np.array(samples) * 1000
+  return {
+    "mean_ms": float(times.mean()),
+    "p50_ms": float(np.percentile(times, 50)),
+    "p90_ms": float(np.percentile(times, 90)),
+    "p99_ms": float(np.percentile(times, 99)),
+    "max_ms": float(times.max()),
+  }
+
+def run_scenario(name, assets, font, surface, frames, seed):
+  settings = SCENARIOS[name]
+  rng = random.Random(seed)
+  random.seed(seed)
+  clock = game_clock.FixedClock(1000 / constants.FPS)
+  game_clock.set_source(clock)
+  try:
+    world = World()
+    world.process_data(build_map(rng, **settings), assets)
+    game = Game(assets, font = font, prefetch = False, world = world)
+    policy = WanderPolicy(seed)
+    timings = {stage: [] for stage in STAGES + ["frame"]}
+    for tick in range(frames):
+      top_up_projectiles(game, rng, settings.get("arrows", 0), settings.get("fireballs", 0))
+      inputs = policy(game, tick)
+      frame_start = time.perf_counter()
+      for stage in STAGES:
+        start = time.perf_counter()
+        if stage == "draw":
+          surface.fill(constants.BG)
+          game.draw(surface)
+        elif stage in ("move_player", "update_player"):
+          getattr(game, stage)(inputs)
+        else:
+          getattr(game, stage)()
+        timings[stage].append(time.perf_counter() - start)
+      timings["frame"].append(time.perf_counter() - frame_start)
+      #keep the player alive so every frame measures the same workload
+      game.player.health = 100
+      game.player.alive = True
+      clock.advance()
+    return {
+      "enemies": len(game.enemy_list),
+      "items": len(game.item_group),
+      "stages": {stage: percentiles(samples) for stage, samples in timings.items()},
+    }
+  finally:
+    game_clock.reset()
+
+def git_revision():
+  try:
+    return subprocess.run(["git", "rev-parse", "HEAD"], capture_output = True, text = True, check = True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def main():
+  parser = argparse.ArgumentParser(description = "Time each stage of the game loop on synthetic stress scenarios")
+  parser.add_argument("--frames", type = int, default = 300)
+  parser.add_argument("--seed", type = int, default = 0)
+  parser.add_argument("--scenario", action = "append", choices = sorted(SCENARIOS), help = "run only this scenario, can be repeated")
+  parser.add_argument("--output", help = "write the JSON report to this file instead of stdout")
+  args = parser.parse_args()
+
+  pygame.init()
+  surface = pygame.display.set_mode((constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT))
+  assets = AssetPack()
+  font = pygame.font.Font("assets/fonts/AtariClassic.ttf", 20)
+  report = {
+    "revision": git_revision(),
+    "python": platform.python_version(),
+    "pygame": pygame.version.ver,
+    "frames": args.frames,
+    "seed": args.seed,
+    "scenarios": {},
+  }
+  for name in args.scenario or SCENARIOS:
+    report["scenarios"][name] = run_scenario(name, assets, font, surface, args.frames, args.seed)
+  pygame.quit()
+
+  output = json.dumps(report, indent = 2)
+  if args.output:
+    with open(args.output, "w") as report_file:
+      report_file.write(output + "\n")
+  else:
+    print(output)
+
+if __name__ == "__main__":
+  main()
@@ -5,15 +5,13 @@ class Button():
         self.img = img
         self.rect = self.img.get_rect()
         self.rect.topleft = (x,y)
-    def draw(self, surface):
+    def draw(self, surface, events):
         action = False
 
-        # get mouse position
-        pos = pygame.mouse.get_pos()
-
-        # check for mouse over and clicked condition
-        if self.rect.collidepoint(pos) and pygame.mouse.get_pressed()[0]:
-            action = True
+        # check for a left click on the button, events keep clicks that are too quick to see by polling the mouse
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.rect.collidepoint(event.pos):
+                action = True
 
         surface.blit(self.img, self.rect)
-        return action
\ No newline at end of file
+        return action
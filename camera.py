@@ -0,0 +1,39 @@
+import math
+import constants
+
+def lerp(start, end, alpha):
+  #blend two pixel positions, rounding half up
+  return math.floor(start + (end - start) * alpha + 0.5)
+
+class Camera():
+  def __init__(self):
+    #world coordinates of the top left corner of the screen
+    self.x = 0
+    self.y = 0
+    #position at the start of the current tick
+    self.prev_x = 0
+    self.prev_y = 0
+
+  def remember(self):
+    self.prev_x = self.x
+    self.prev_y = self.y
+
+  def interpolated(self, alpha):
+    #camera blended between the last two ticks
+    camera = Camera()
+    camera.x = lerp(self.prev_x, self.x, alpha)
+    camera.y = lerp(self.prev_y, self.y, alpha)
+    return camera
+
+  def follow(self, target):
+    #move camera left and right when the target leaves the scroll window
+    if target.right - self.x > (constants.SCREEN_WIDTH - constants.SCROLL_THRESH):
+      self.x = target.right - (constants.SCREEN_WIDTH - constants.SCROLL_THRESH)
+    if target.left - self.x < constants.SCROLL_THRESH:
+      self.x = target.left - constants.SCROLL_THRESH
+
+    #move camera up and down
+    if target.bottom - self.y > (constants.SCREEN_HEIGHT - constants.SCROLL_THRESH):
+      self.y = target.bottom - (constants.SCREEN_HEIGHT - constants.SCROLL_THRESH)
+    if target.top - self.y < constants.SCROLL_THRESH:
+      self.y = target.top - constants.SCROLL_THRESH
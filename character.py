@@ -2,31 +2,83 @@ import pygame
 import math
 import weapon
 import constants
+import game_clock
+from camera import lerp
+from entity_store import EntityStore
+
+def column(name):
+  #attribute stored in the character's row of its store
+  def get(self):
+    return self.store.columns[name][self.index]
+  def set(self, value):
+    self.store.columns[name][self.index] = value
+  return property(get, set)
+
+def flag(name):
+  #boolean attribute stored as a byte
+  def get(self):
+    return self.store.columns[name][self.index] != 0
+  def set(self, value):
+    self.store.columns[name][self.index] = value
+  return property(get, set)
+
+def row_value(name):
+  #attribute kept in one of the store's object lists
+  def get(self):
+    return getattr(self.store, name)[self.index]
+  def set(self, value):
+    getattr(self.store, name)[self.index] = value
+  return property(get, set)
 
 class Character():
-  def __init__(self, x, y, health, mob_animations, char_type, boss, size):
-    self.char_type = char_type
-    self.boss = boss
-    self.score = 0
-    self.flip = False
-    self.animation_list = mob_animations[char_type]
-    self.frame_index = 0
-    self.action = 0#0:idle, 1:run
-    self.update_time = pygame.time.get_ticks()
-    self.running = False
-    self.health = health
-    self.alive = True
-    self.hit = False
-    self.last_hit = pygame.time.get_ticks()
-    self.last_attack = pygame.time.get_ticks()
-    self.stunned = False
-
-    self.image = self.animation_list[self.action][self.frame_index]
-    self.rect = pygame.Rect(0, 0, constants.TILE_SIZE * size, constants.TILE_SIZE * size)
-    self.rect.center = (x, y)
-
-  def move(self, dx, dy, obstacle_tiles, exit_tile = None):
-    screen_scroll = [0, 0]
+  #all state lives in an EntityStore, a character is only a view of its row
+  __slots__ = ("store", "index")
+
+  char_type = column("char_type")
+  score = column("score")
+  action = column("action")#0:idle, 1:run
+  #the track frame the current action started on
+  phase = column("phase")
+  health = column("health")
+  last_hit = column("last_hit")
+  last_attack = column("last_attack")
+  boss = flag("boss")
+  flip = flag("flip")
+  running = flag("running")
+  alive = flag("alive")
+  hit = flag("hit")
+  stunned = flag("stunned")
+  awake = flag("awake")#enemies sleep until the player comes near
+  image = row_value("images")
+  animation_list = row_value("animation_lists")#[flip][action][frame]
+  #shared animation track, set by the game when the level starts
+  track = row_value("tracks")
+
+  def __init__(self, x, y, health, mob_animations, char_type, boss, size, store = None):
+    #characters of a level share one store, a character made on its own gets a store of its own
+    self.store = store if store is not None else EntityStore()
+    rect = pygame.Rect(0, 0, constants.TILE_SIZE * size, constants.TILE_SIZE * size)
+    rect.center = (x, y)
+    animation_list = mob_animations[char_type]
+    self.index = self.store.add(self, animation_list[False][0][0], animation_list,
+      x = rect.x, y = rect.y, width = rect.width, height = rect.height,
+      health = health, char_type = char_type, boss = boss, alive = True,
+      last_hit = game_clock.get_ticks(), last_attack = game_clock.get_ticks())
+
+  @property
+  def rect(self):
+    #a copy of the character's rect, assign it back after changing it
+    columns = self.store.columns
+    i = self.index
+    return pygame.Rect(columns["x"][i], columns["y"][i], columns["width"][i], columns["height"][i])
+
+  @rect.setter
+  def rect(self, rect):
+    columns = self.store.columns
+    i = self.index
+    columns["x"][i], columns["y"][i], columns["width"][i], columns["height"][i] = rect
+
+  def move(self, dx, dy, tile_grid, exit_tile = None):
     level_complete = False
     self.running = False
     
@@ -42,111 +94,85 @@ class Character():
       dy = dy * (math.sqrt(2)/2)
 
     #check for collision with map in x direction
-    self.rect.x += dx
-    for obstacle in obstacle_tiles:
-      #check for collision
-      if obstacle[1].colliderect(self.rect):
-        #check which side the collision is from
-        if dx > 0:
-          self.rect.right = obstacle[1].left
-        if dx < 0:
-          self.rect.left = obstacle[1].right
+    rect = self.rect
+    rect.x += dx
+    tile_grid.push_out_x(rect, dx)
 
     #check for collision with map in y direction
-    self.rect.y += dy
-    for obstacle in obstacle_tiles:
-      #check for collision
-      if obstacle[1].colliderect(self.rect):
-        #check which side the collision is from
-        if dy > 0:
-          self.rect.bottom = obstacle[1].top
-        if dy < 0:
-          self.rect.top = obstacle[1].bottom
+    rect.y += dy
+    tile_grid.push_out_y(rect, dy)
+    self.rect = rect
 
     #logic only applicable to player
     if self.char_type == 0:
       #check collision with exit ladder
-      if exit_tile[1].colliderect(self.rect):
+      if exit_tile[1].colliderect(rect):
         #ensure player is close to the center of the exit ladder
-        exit_dist = math.sqrt(((self.rect.centerx - exit_tile[1].centerx) ** 2) + ((self.rect.centery - exit_tile[1].centery) ** 2))
+        exit_dist = math.sqrt(((rect.centerx - exit_tile[1].centerx) ** 2) + ((rect.centery - exit_tile[1].centery) ** 2))
         if exit_dist < 20:
           level_complete = True
 
-      #update scroll based on player position
-      #move camera left and right
-      if self.rect.right > (constants.SCREEN_WIDTH - constants.SCROLL_THRESH):
-        screen_scroll[0] = (constants.SCREEN_WIDTH - constants.SCROLL_THRESH) - self.rect.right
-        self.rect.right = constants.SCREEN_WIDTH - constants.SCROLL_THRESH
-      if self.rect.left < constants.SCROLL_THRESH:
-        screen_scroll[0] = constants.SCROLL_THRESH - self.rect.left
-        self.rect.left = constants.SCROLL_THRESH
-
-      #move camera up and down
-      if self.rect.bottom > (constants.SCREEN_HEIGHT - constants.SCROLL_THRESH):
-        screen_scroll[1] = (constants.SCREEN_HEIGHT - constants.SCROLL_THRESH) - self.rect.bottom
-        self.rect.bottom = constants.SCREEN_HEIGHT - constants.SCROLL_THRESH
-      if self.rect.top < constants.SCROLL_THRESH:
-        screen_scroll[1] = constants.SCROLL_THRESH - self.rect.top
-        self.rect.top = constants.SCROLL_THRESH
-
-    return screen_scroll, level_complete
-
-  def ai(self, player, obstacle_tiles, screen_scroll, fireball_image):
-    clipped_line = ()
-    stun_cooldown = 100
+    return level_complete
+
+  def ai(self, player, tile_grid, flow_field, fireball_rotations, steps = 1):
+    #steps is the number of frames this tick covers, enemies that tick less often move further each time
     ai_dx = 0
     ai_dy = 0
+    speed = constants.ENEMY_SPEED * steps
     fireball = None
+    rect = self.rect
+    player_rect = player.rect
 
-    #reposition the mobs based on screen scroll
-    self.rect.x += screen_scroll[0]
-    self.rect.y += screen_scroll[1]
-
-    #create a line of sight from the enemy to the player
-    line_of_sight = ((self.rect.centerx, self.rect.centery), (player.rect.centerx, player.rect.centery))
-    #check if line of sight passes through an obstacle tile
-    for obstacle in obstacle_tiles:
-      if obstacle[1].clipline(line_of_sight):
-        clipped_line = obstacle[1].clipline(line_of_sight)
+    #check if the line of sight from the enemy to the player passes through an obstacle tile
+    line_of_sight = tile_grid.line_of_sight(rect.center, player_rect.center, constants.LOS_CACHE)
 
     #check distance to player
-    dist = math.sqrt(((self.rect.centerx - player.rect.centerx) ** 2) + ((self.rect.centery - player.rect.centery) ** 2))
-    if not clipped_line and dist > constants.RANGE:
-      if self.rect.centerx > player.rect.centerx:
-        ai_dx = -constants.ENEMY_SPEED
-      if self.rect.centerx < player.rect.centerx:
-        ai_dx = constants.ENEMY_SPEED
-      if self.rect.centery > player.rect.centery:
-        ai_dy = -constants.ENEMY_SPEED
-      if self.rect.centery < player.rect.centery:
-        ai_dy = constants.ENEMY_SPEED
+    dist = math.sqrt(((rect.centerx - player_rect.centerx) ** 2) + ((rect.centery - player_rect.centery) ** 2))
+    if line_of_sight and dist > constants.RANGE:
+      if rect.centerx > player_rect.centerx:
+        ai_dx = -speed
+      if rect.centerx < player_rect.centerx:
+        ai_dx = speed
+      if rect.centery > player_rect.centery:
+        ai_dy = -speed
+      if rect.centery < player_rect.centery:
+        ai_dy = speed
+    elif not line_of_sight:
+      #the player is out of sight so follow the flow field around the walls
+      next_cell = flow_field.direction(rect)
+      if next_cell:
+        #head for the centre of the next cell, without overshooting it
+        target_dx = next_cell[0] * constants.TILE_SIZE - rect.centerx
+        target_dy = next_cell[1] * constants.TILE_SIZE - rect.centery
+        ai_dx = max(-speed, min(speed, target_dx))
+        ai_dy = max(-speed, min(speed, target_dy))
 
     if self.alive:
       if not self.stunned:
         #move towards player
-        self.move(ai_dx, ai_dy, obstacle_tiles)
+        self.move(ai_dx, ai_dy, tile_grid)
         #attack player
         if dist < constants.ATTACK_RANGE and player.hit == False:
-          player.health -= 10
+          player.health -= constants.ATTACK_DAMAGE
           player.hit = True
-          player.last_hit = pygame.time.get_ticks()
+          player.last_hit = game_clock.get_ticks()
         #boss enemies shoot fireballs
-        fireball_cooldown = 700
         if self.boss:
-          if dist < 500:
-            if pygame.time.get_ticks() - self.last_attack >= fireball_cooldown:
-              fireball = weapon.Fireball(fireball_image, self.rect.centerx, self.rect.centery, player.rect.centerx, player.rect.centery)
-              self.last_attack = pygame.time.get_ticks()
+          if dist < constants.FIREBALL_RANGE:
+            if game_clock.get_ticks() - self.last_attack >= constants.FIREBALL_COOLDOWN:
+              rect = self.rect
+              fireball = weapon.Fireball(fireball_rotations, rect.centerx, rect.centery, player_rect.centerx, player_rect.centery)
+              self.last_attack = game_clock.get_ticks()
 
       #check if hit
       if self.hit == True:
         self.hit = False
-        self.last_hit = pygame.time.get_ticks()
+        self.last_hit = game_clock.get_ticks()
         self.stunned = True
         self.running = False
         self.update_action(0)
 
-      if (pygame.time.get_ticks() - self.last_hit > stun_cooldown):
+      if (game_clock.get_ticks() - self.last_hit > constants.STUN_COOLDOWN):
         self.stunned = False
 
     return fireball
@@ -160,7 +186,7 @@ class Character():
     #timer to reset player taking a hit
     hit_cooldown = 1000
     if self.char_type == 0:
-      if self.hit == True and (pygame.time.get_ticks() - self.last_hit) > hit_cooldown:
+      if self.hit == True and (game_clock.get_ticks() - self.last_hit) > hit_cooldown:
         self.hit = False
 
     #check what action the player is performing
@@ -169,30 +195,40 @@ class Character():
     else:
       self.update_action(0)#0:idle
 
-    animation_cooldown = 70
     #handle animation
-    #update image
-    self.image = self.animation_list[self.action][self.frame_index]
-    #check if enough time has passed since the last update
-    if pygame.time.get_ticks() - self.update_time > animation_cooldown:
-      self.frame_index += 1
-      self.update_time = pygame.time.get_ticks()
-    #check if the animation has finished
-    if self.frame_index >= len(self.animation_list[self.action]):
-      self.frame_index = 0
+    #update image, picking the mirrored frame when facing left, the animation loops on the shared track
+    frames = self.animation_list[self.flip][self.action]
+    if self.track is not None:
+      self.image = frames[(self.track.frame - self.phase) % len(frames)]
 
   def update_action(self, new_action):
     #check if the new action is different to the previous one
     if new_action != self.action:
       self.action = new_action
-      #update the animation settings
-      self.frame_index = 0
-      self.update_time = pygame.time.get_ticks()
-
-
-  def draw(self, surface):
-    flipped_image = pygame.transform.flip(self.image, self.flip, False)
+      #restart the animation from the current track frame
+      if self.track is not None:
+        self.phase = self.track.frame
+
+  def set_track(self, track):
+    self.track = track
+    self.phase = track.frame
+
+
+  def position(self, alpha = 1.0):
+    #top left corner blended between the last two ticks
+    columns = self.store.columns
+    i = self.index
+    x = columns["x"][i]
+    y = columns["y"][i]
+    if alpha < 1:
+      x = lerp(columns["prev_x"][i], x, alpha)
+      y = lerp(columns["prev_y"][i], y, alpha)
+    return x, y
+
+  def draw(self, surface, camera, alpha = 1.0):
+    #returns the screen area drawn to
+    x, y = self.position(alpha)
     if self.char_type == 0:
-      surface.blit(flipped_image, (self.rect.x, self.rect.y - constants.SCALE * constants.OFFSET))
+      return surface.blit(self.image, (x - camera.x, y - camera.y - constants.SCALE * constants.OFFSET))
     else:
-      surface.blit(flipped_image, self.rect)
\ No newline at end of file
+      return surface.blit(self.image, (x - camera.x, y - camera.y))
\ No newline at end of file
@@ -0,0 +1,154 @@
+import argparse
+import math
+import random
+import sys
+import numpy as np
+import pygame
+import constants
+import game_clock
+import benchmark
+import level_loader
+from asset_pack import AssetPack
+from engine import Game
+from world import World
+from simulate import WanderPolicy
+
+#the optimised code paths that must give exactly the same results as the straightforward ones
+#run this after changing Character.ai, batch_ai, the activity scheduler or TileGrid collisions
+
+AI_SCENARIOS = ["enemies_100", "maze", "boss_fireballs", "arrows"]
+
+def game_state(game):
+  #everything the enemy ai can change in a tick
+  return (
+    {name: list(column) for name, column in game.enemy_list.columns.items()},
+    [id(image) for image in game.enemy_list.images],
+    {name: list(column) for name, column in game.player.store.columns.items()},
+    [array[:len(game.fireball_group)].copy() for array in game.fireball_group.arrays()],
+  )
+
+def run_ai(name, assets, batch, frames, seed):
+  #play a benchmark scenario with one of the two enemy ai paths and return the state after every tick
+  settings = benchmark.SCENARIOS[name]
+  rng = random.Random(seed)
+  random.seed(seed)
+  clock = game_clock.FixedClock(1000 / constants.FPS)
+  game_clock.set_source(clock)
+  batch_ai = constants.BATCH_AI
+  constants.BATCH_AI = batch
+  try:
+    world = World()
+    world.process_data(benchmark.build_map(rng, **settings), assets, False)
+    game = Game(assets, prefetch = False, render = False, world = world)
+    policy = WanderPolicy(seed)
+    states = []
+    for tick in range(frames):
+      benchmark.top_up_projectiles(game, rng, settings.get("arrows", 0), settings.get("fireballs", 0))
+      game.step(policy(game, tick))
+      clock.advance()
+      states.append(game_state(game))
+      #keep the player alive so the enemies keep attacking
+      game.player.health = 100
+      game.player.alive = True
+    return states
+  finally:
+    constants.BATCH_AI = batch_ai
+    game_clock.reset()
+
+def check_ai(assets, frames, seed):
+  #batch_ai must match calling Character.ai then update on each active enemy in turn
+  ok = True
+  for name in AI_SCENARIOS:
+    batch = run_ai(name, assets, True, frames, seed)
+    loop = run_ai(name, assets, False, frames, seed)
+    tick = next((tick for tick, (a, b) in enumerate(zip(batch, loop)) if not states_equal(a, b)), None)
+    if tick is None:
+      print(f"ai {name}: identical for {frames} ticks")
+    else:
+      print(f"ai {name}: batch_ai differs from Character.ai from tick {tick}")
+      ok = False
+  return ok
+
+def states_equal(a, b):
+  #the fireball arrays are numpy, so they're compared separately
+  return a[:3] == b[:3] and all(np.array_equal(x, y) for x, y in zip(a[3], b[3]))
+
+def scan_x(walls, rect, dx):
+  #the original collision check, every wall in level order
+  for wall in walls:
+    if wall.colliderect(rect):
+      if dx > 0:
+        rect.right = wall.left
+      if dx < 0:
+        rect.left = wall.right
+
+def scan_y(walls, rect, dy):
+  for wall in walls:
+    if wall.colliderect(rect):
+      if dy > 0:
+        rect.bottom = wall.top
+      if dy < 0:
+        rect.top = wall.bottom
+
+def check_collisions(assets, samples, seed):
+  #TileGrid.push_out_x and push_out_y only look at nearby cells but must match scanning every wall
+  rng = random.Random(seed)
+  maps = {}
+  level = 1
+  while level_loader.level_exists(level):
+    maps[f"level {level}"] = level_loader.load_level(level)
+    level += 1
+  maps["maze"] = benchmark.build_map(random.Random(seed), **benchmark.SCENARIOS["maze"])
+  speeds = [constants.SPEED, constants.ENEMY_SPEED, constants.ENEMY_SPEED * 4]
+  ok = True
+  for name, data in maps.items():
+    world = World()
+    world.process_data(data, assets, False)
+    grid = world.tile_grid
+    walls = [wall for wall in grid.walls if wall is not None]
+    cells = [index for index, walkable in enumerate(grid.walkable) if walkable]
+    mismatches = 0
+    for sample in range(samples):
+      #a player, enemy or boss sized rect somewhere around a floor cell, moving in any of the eight directions
+      size = constants.TILE_SIZE * rng.choice([1, 1, 2])
+      cell = rng.choice(cells)
+      rect = pygame.Rect(0, 0, size, size)
+      rect.center = ((cell % grid.cols) * constants.TILE_SIZE + rng.randint(-constants.TILE_SIZE, constants.TILE_SIZE),
+        (cell // grid.cols) * constants.TILE_SIZE + rng.randint(-constants.TILE_SIZE, constants.TILE_SIZE))
+      speed = rng.choice(speeds)
+      dx = rng.choice([-speed, 0, speed])
+      dy = rng.choice([-speed, 0, speed])
+      if dx != 0 and dy != 0:
+        dx = dx * (math.sqrt(2)/2)
+        dy = dy * (math.sqrt(2)/2)
+      expected = rect.copy()
+      expected.x += dx
+      scan_x(walls, expected, dx)
+      expected.y += dy
+      scan_y(walls, expected, dy)
+      rect.x += dx
+      grid.push_out_x(rect, dx)
+      rect.y += dy
+      grid.push_out_y(rect, dy)
+      if rect != expected:
+        mismatches += 1
+    if mismatches:
+      print(f"collisions {name}: {mismatches} of {samples} moves differ from scanning every wall")
+      ok = False
+    else:
+      print(f"collisions {name}: identical for {samples} moves")
+  return ok
+
+def main():
+  parser = argparse.ArgumentParser(description = "Check the optimised code paths give the same results as the plain ones")
+  parser.add_argument("--frames", type = int, default = 300)
+  parser.add_argument("--seed", type = int, default = 0)
+  parser.add_argument("--moves", type = int, default = 5000, help = "random moves to check collisions with on each map")
+  args = parser.parse_args()
+  assets = AssetPack()
+  ok = check_ai(assets, args.frames, args.seed)
+  ok = check_collisions(assets, args.moves, args.seed) and ok
+  sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+  main()
@@ -1,4 +1,6 @@
-FPS = 60
+FPS = 60#game ticks per second, speeds are in pixels per tick
+RENDER_FPS = 144#most frames drawn per second, positions are blended between ticks
+MAX_SUBSTEPS = 5#most ticks run in one frame to catch up after a stall
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 SCALE = 3
@@ -7,6 +9,7 @@ ITEM_SCALE = 3
 POTION_SCALE = 2
 FIREBALL_SCALE = 1
 BUTTON_SCALE = 1
+ROTATION_STEPS = 128#pre-rendered angles per rotating image
 SPEED = 5
 ARROW_SPEED = 10
 FIREBALL_SPEED = 4
@@ -14,11 +17,29 @@ ENEMY_SPEED = 4
 OFFSET = 12
 TILE_SIZE = 16 * SCALE
 TILE_TYPES = 18
-ROWS = 150
-COLS = 150
+CHUNK_SIZE = 8#tiles per side of a pre-rendered background chunk
+CHUNK_CACHE_BYTES = 24 * 1024 * 1024#memory kept for baked background chunks per world, the least recently drawn are dropped
+#milliseconds between animation frames for each shared animation track
+ANIMATION_TRACKS = {"character": 70, "item": 150}
+ITEM_CELL_SIZE = 16 * SCALE * 4#pixels per side of the cells items are bucketed in for pickups and drawing
 SCROLL_THRESH = 200
+DIRTY_RECTS = True#only send the parts of the screen that changed to the display
+DIRTY_RECT_LIMIT = 200#update the whole screen instead when more areas than this changed
+TEXT_CACHE_BYTES = 2 * 1024 * 1024#memory kept for rendered text surfaces
+PLAYER_HEALTH = 100
+ENEMY_HEALTH = 40
+BOSS_HEALTH = 250
+POTION_HEAL = 10#health a potion gives back, up to PLAYER_HEALTH
 RANGE = 50
 ATTACK_RANGE = 60
+ATTACK_DAMAGE = 10#health an enemy takes off the player per hit
+STUN_COOLDOWN = 100#milliseconds an enemy is stunned after being hit
+FIREBALL_RANGE = 500#pixels from the player a boss starts shooting
+FIREBALL_COOLDOWN = 700#milliseconds between boss fireballs
+FLOW_FIELD_RANGE = 30#tiles enemies will path around walls from
+LOS_CACHE = False#share line of sight results between enemies in the same tile each frame
+BATCH_AI = True#run enemy ai for all active enemies at once with numpy instead of one at a time
+ACTIVITY_MARGIN = 100#pixels around the screen where enemies tick every frame
 
 WHITE = (255, 255, 255)
 BLACK = (0,0,0)
@@ -0,0 +1,28 @@
+import pygame
+from text_cache import text_cache
+
+class DamageText(pygame.sprite.Sprite):
+  def __init__(self, x, y, damage, color, font):
+    pygame.sprite.Sprite.__init__(self)
+    self.damage = damage
+    self.color = color
+    self.font = font
+    #the text is only rendered when it is first drawn, so simulations without a screen skip it
+    self.image = None
+    self.x = x
+    self.y = y
+    self.counter = 0
+
+  def update(self):
+    #move damage text up
+    self.y -= 1
+    #delete the damage text after a few seconds
+    self.counter += 1
+    if self.counter > 30:
+      self.kill()
+
+  def draw(self, surface, camera):
+    if self.image is None:
+      self.image = text_cache.render(self.font, self.damage, self.color)
+    rect = self.image.get_rect(center = (self.x, self.y))
+    return surface.blit(self.image, (rect.x - camera.x, rect.y - camera.y))
@@ -0,0 +1,34 @@
+import pygame
+import constants
+
+class DirtyRects():
+  #collects the screen areas drawn each frame and only sends those to the display
+  def __init__(self, enabled = constants.DIRTY_RECTS):
+    self.enabled = enabled
+    self.current = []
+    self.previous = []
+    #frames left that are sent to the display in full
+    self.full = 2
+
+  def add(self, rect):
+    self.current.append(rect)
+
+  def extend(self, rects):
+    self.current += rects
+
+  def invalidate(self):
+    #the whole screen changed, e.g. the camera moved or a menu or fade was drawn
+    #the next frame is sent in full as well so whatever covered the screen gets cleared
+    self.full = 2
+
+  def update(self):
+    #areas drawn last frame are included so sprites that moved or disappeared get cleared
+    rects = [rect for rect in self.previous + self.current if rect]
+    if self.full > 0 or not self.enabled or len(rects) > constants.DIRTY_RECT_LIMIT:
+      pygame.display.update()
+    elif rects:
+      pygame.display.update(rects)
+    self.previous = self.current
+    self.current = []
+    if self.full > 0:
+      self.full -= 1
@@ -0,0 +1,217 @@
+import pygame
+import constants
+import level_loader
+import game_clock
+from weapon import Weapon
+from items import Item
+from world import World
+from camera import Camera
+from activity import ActivityScheduler
+from projectiles import ProjectileGroup
+from rotation_cache import RotationCache
+from damage_text import DamageText
+from spatial_hash import SpatialHash
+from animation import AnimationScheduler
+from batch_ai import batch_ai
+from profiler import FrameProfiler
+
+class Game():
+  def __init__(self, assets, level = 1, font = None, prefetch = True, render = True, world = None, profiler = None):
+    self.assets = assets
+    #every stage of step and draw is marked on the profiler, it does nothing until enabled
+    self.profiler = profiler if profiler is not None else FrameProfiler()
+    self.level = level
+    self.font = font#used for damage text, can be None when nothing is drawn
+    self.render = render
+    self.game_complete = False
+    self.fireball_rotations = RotationCache(assets.image("fireball"))
+    #create player's weapon
+    self.bow = Weapon(assets.image("bow"), assets.image("arrow"))
+    #create scheduler that decides which enemies are active each frame
+    self.activity = ActivityScheduler(assets.mob_activity)
+
+    #create sprite groups
+    self.damage_text_group = pygame.sprite.Group()
+    self.arrow_group = ProjectileGroup()
+    self.item_group = pygame.sprite.Group()
+    self.fireball_group = ProjectileGroup()
+    #level items bucketed by position, so only the ones near the player or on screen are looked at
+    self.item_index = SpatialHash(constants.ITEM_CELL_SIZE)
+    #shared animation tracks for characters and items, advanced once per step
+    self.animation = AnimationScheduler()
+
+    #sounds to play for the last step: "shot", "hit", "coin" and "heal"
+    self.events = []
+
+    #build levels in the background so level changes and restarts don't stall a frame
+    self.prefetcher = level_loader.LevelPrefetcher(self.load_world) if prefetch else None
+    #a prebuilt world can be passed in instead of loading the level, e.g. for benchmarks
+    self.start_level(world if world is not None else self.take_world(level))
+
+  def load_world(self, level):
+    #load in level data and create world
+    world = World()
+    world.process_data(level_loader.load_level(level), self.assets, self.render)
+    return world
+
+  def take_world(self, level):
+    if self.prefetcher is None:
+      return self.load_world(level)
+    world = self.prefetcher.take(level)
+    #keep a spare copy of this level for restarts and start on the next one, earlier levels are never played again
+    self.prefetcher.keep((level, level + 1))
+    self.prefetcher.prefetch(level)
+    self.prefetcher.prefetch(level + 1)
+    return world
+
+  def start_level(self, world, health = None, score = 0):
+    #function to reset level
+    self.damage_text_group.empty()
+    self.arrow_group.empty()
+    self.item_group.empty()
+    self.item_index.clear()
+    self.fireball_group.empty()
+
+    self.world = world
+    self.camera = Camera()
+    self.player = world.player
+    #start the camera on the player so the first frames don't scroll in from the corner
+    self.camera.follow(self.player.rect)
+    self.camera.remember()
+    if health is not None:
+      self.player.health = health
+    self.player.score = score
+    self.enemy_list = world.character_list
+    world.start_timers(game_clock.get_ticks())
+
+    #start every animation on the first frame
+    self.animation.reset()
+    character_track = self.animation.track("character")
+    item_track = self.animation.track("item")
+    self.player.set_track(character_track)
+    for enemy in self.enemy_list:
+      enemy.set_track(character_track)
+
+    self.score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, self.assets.animation("coin"), True)
+    self.score_coin.set_track(item_track)
+    self.item_group.add(self.score_coin)
+    #add the items from the level data
+    for item in world.item_list:
+      item.set_track(item_track)
+      self.item_group.add(item)
+      self.item_index.add(item)
+
+  def next_level(self):
+    if not level_loader.level_exists(self.level + 1):
+      self.game_complete = True
+      return
+    self.level += 1
+    self.start_level(self.take_world(self.level), self.player.health, self.player.score)
+
+  def restart(self):
+    self.start_level(self.take_world(self.level), score = self.player.score)
+
+  def step(self, inputs):
+    #advance the game by one frame, returns True if the player reached the exit
+    self.events = []
+    profiler = self.profiler
+    self.remember()
+    level_complete = self.move_player(inputs)
+    profiler.mark("move_player")
+    self.update_world()
+    profiler.mark("update_world")
+    self.update_enemies()
+    profiler.mark("update_enemies")
+    self.update_player(inputs)
+    profiler.mark("update_player")
+    self.update_projectiles()
+    profiler.mark("update_projectiles")
+    self.update_items()
+    profiler.mark("update_items")
+
+    #check level complete
+    if level_complete:
+      self.next_level()
+    return level_complete
+
+  def remember(self):
+    #keep where everything was at the start of the tick so frames drawn between ticks can blend positions
+    self.camera.remember()
+    self.player.store.remember()
+    self.enemy_list.remember()
+    self.arrow_group.remember()
+    self.fireball_group.remember()
+
+  def move_player(self, inputs):
+    dx, dy = inputs.movement()
+    level_complete = self.player.move(dx, dy, self.world.tile_grid, self.world.exit_tile)
+    self.camera.follow(self.player.rect)
+    return level_complete
+
+  def update_world(self):
+    self.animation.update()
+    self.world.tile_grid.clear_cache()
+    self.world.flow_field.update(self.player.rect)
+
+  def update_enemies(self):
+    world = self.world
+    if constants.BATCH_AI:
+      rows, steps = self.activity.active_rows(self.enemy_list, self.player, self.camera)
+      for fireball in batch_ai(self.enemy_list, rows, self.player, world.tile_grid, world.flow_field, self.fireball_rotations, steps):
+        self.fireball_group.add(fireball)
+      return
+    for enemy, steps in self.activity.active(self.enemy_list, self.player, self.camera):
+      fireball = enemy.ai(self.player, world.tile_grid, world.flow_field, self.fireball_rotations, steps)
+      if fireball:
+        self.fireball_group.add(fireball)
+      if enemy.alive:
+        enemy.update()
+
+  def update_player(self, inputs):
+    self.player.update()
+    arrow = self.bow.update(self.player, self.camera, inputs)
+    if arrow:
+      self.arrow_group.add(arrow)
+      self.events.append("shot")
+
+  def update_projectiles(self):
+    for damage, damage_pos in self.arrow_group.update(self.camera, self.world.tile_grid, self.player, self.enemy_list):
+      self.events.append("hit")
+      damage_text = DamageText(damage_pos.centerx, damage_pos.y, str(damage), constants.RED, self.font)
+      self.damage_text_group.add(damage_text)
+    self.damage_text_group.update()
+    self.fireball_group.update(self.camera, self.world.tile_grid, self.player, self.enemy_list)
+
+  def update_items(self):
+    for item in self.item_index.query(self.player.rect):
+      if item.update(self.player, self.events):
+        self.item_index.remove(item)
+
+  def draw(self, surface, alpha = 1.0):
+    #returns the screen areas covered by sprites, the background only changes when the camera moves
+    #alpha blends moving things between the previous tick and the current one
+    camera = self.camera.interpolated(alpha) if alpha < 1 else self.camera
+    profiler = self.profiler
+    self.world.draw(surface, camera)
+    profiler.mark("draw_world")
+    dirty = self.enemy_list.draw(surface, camera, alpha)
+    dirty.append(self.player.draw(surface, camera, alpha))
+    #the bow sits on the player so it moves with the blended player position
+    player_x, player_y = self.player.position(alpha)
+    player_rect = self.player.rect
+    dirty.append(self.bow.draw(surface, camera, (player_x - player_rect.x, player_y - player_rect.y)))
+    profiler.mark("draw_characters")
+    dirty += self.arrow_group.draw(surface, camera, alpha)
+    dirty += self.fireball_group.draw(surface, camera, alpha)
+    profiler.mark("draw_projectiles")
+    for damage_text in self.damage_text_group:
+      dirty.append(damage_text.draw(surface, camera))
+    for item in self.item_index.query(pygame.Rect(camera.x, camera.y, surface.get_width(), surface.get_height())):
+      dirty.append(item.draw(surface, camera))
+    dirty.append(self.score_coin.draw(surface, camera))
+    profiler.mark("draw_items")
+    return dirty
+
+  def shutdown(self):
+    if self.prefetcher is not None:
+      self.prefetcher.shutdown()
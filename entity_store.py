@@ -0,0 +1,96 @@
+from array import array
+import numpy as np
+
+#character state kept one array per field, booleans are stored as bytes
+COLUMNS = {
+  "x": "i",
+  "y": "i",
+  "prev_x": "i",#position at the start of the current tick
+  "prev_y": "i",
+  "width": "i",
+  "height": "i",
+  "health": "i",
+  "score": "i",
+  "char_type": "b",
+  "action": "b",#0:idle, 1:run
+  "phase": "q",#track frame the current action started on
+  "last_hit": "q",
+  "last_attack": "q",
+  "last_tick": "q",#activity frame the enemy last ran its ai on
+  "alive": "b",
+  "hit": "b",
+  "stunned": "b",
+  "running": "b",
+  "flip": "b",
+  "awake": "b",
+  "boss": "b",
+}
+
+class EntityStore():
+  #rows of character state, a Character is a view of one row
+  #the store is also a sequence of those views so it can stand in for a list of characters
+  def __init__(self):
+    self.columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    #values that aren't numbers are kept in plain lists in the same order
+    self.images = []
+    self.animation_lists = []
+    self.tracks = []
+    self.views = []
+
+  def __len__(self):
+    return len(self.views)
+
+  def __iter__(self):
+    return iter(self.views)
+
+  def __getitem__(self, index):
+    return self.views[index]
+
+  def add(self, view, image, animation_list, **values):
+    #returns the row index for the view
+    values.setdefault("prev_x", values.get("x", 0))
+    values.setdefault("prev_y", values.get("y", 0))
+    for name, column in self.columns.items():
+      column.append(values.get(name, 0))
+    self.images.append(image)
+    self.animation_lists.append(animation_list)
+    self.tracks.append(None)
+    self.views.append(view)
+    return len(self.views) - 1
+
+  def column(self, name):
+    #numpy view of a column without copying, don't hold on to it past the next add
+    column = self.columns[name]
+    return np.frombuffer(column, dtype = column.typecode)
+
+  def rects(self):
+    #left, top, right and bottom edges of every row
+    left = self.column("x")
+    top = self.column("y")
+    return left, top, left + self.column("width"), top + self.column("height")
+
+  def remember(self):
+    #keep this tick's positions so drawing can blend towards the next
+    self.columns["prev_x"][:] = self.columns["x"]
+    self.columns["prev_y"][:] = self.columns["y"]
+
+  def positions(self, alpha = 1.0):
+    #top left corners blended between the last two ticks
+    x = self.column("x")
+    y = self.column("y")
+    if alpha >= 1:
+      return x, y
+    prev_x = self.column("prev_x")
+    prev_y = self.column("prev_y")
+    return (np.floor(prev_x + (x - prev_x) * alpha + 0.5).astype(np.int32),
+      np.floor(prev_y + (y - prev_y) * alpha + 0.5).astype(np.int32))
+
+  def centers(self):
+    #centre points matching pygame.Rect.center
+    return self.column("x") + self.column("width") // 2, self.column("y") + self.column("height") // 2
+
+  def draw(self, surface, camera, alpha = 1.0):
+    #draw every row in one call, returns the screen areas drawn to
+    x, y = self.positions(alpha)
+    positions = zip((x - camera.x).tolist(), (y - camera.y).tolist())
+    return surface.blits(list(zip(self.images, positions)))
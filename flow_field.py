@@ -0,0 +1,106 @@
+import numpy as np
+import constants
+
+#neighbour offsets, orthogonal first so ties prefer straight moves
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1)]
+
+class FlowField():
+  def __init__(self, tile_grid):
+    self.tile_grid = tile_grid
+    #steps from each cell to the target cell, only cells stamped with the current generation were reached
+    self.distance = None
+    self.stamp = None
+    self.generation = 0
+    #bit i of a cell's mask is set when NEIGHBOURS[i] can be stepped to from it
+    self.step_mask = None
+    #neighbour index offsets allowed by each mask, in NEIGHBOURS order
+    self.steps = None
+    self.target = None
+    #the field is only searched when an enemy asks for a direction after the target moved
+    self.stale = False
+
+  def update(self, target_rect):
+    #only search again when the target moves into a new cell
+    target = self.tile_grid.cell(target_rect.center)
+    if target != self.target:
+      self.target = target
+      self.stale = True
+
+  def build_step_masks(self):
+    grid = self.tile_grid
+    #pad the walkable cells with a border of walls so steps off the map are never allowed
+    walkable = np.zeros((grid.rows + 2, grid.cols + 2), dtype = bool)
+    walkable[1:-1, 1:-1] = np.array(grid.walkable, dtype = bool).reshape(grid.rows, grid.cols)
+    def shifted(step_x, step_y):
+      return walkable[1 + step_y:1 + step_y + grid.rows, 1 + step_x:1 + step_x + grid.cols]
+    mask = np.zeros((grid.rows, grid.cols), dtype = np.int64)
+    for bit, (step_x, step_y) in enumerate(NEIGHBOURS):
+      allowed = shifted(step_x, step_y)
+      #don't cut across the corner of a wall
+      if step_x != 0 and step_y != 0:
+        allowed = allowed & shifted(step_x, 0) & shifted(0, step_y)
+      mask |= allowed.astype(np.int64) << bit
+    self.step_mask = mask.ravel().tolist()
+    offsets = [step_y * grid.cols + step_x for step_x, step_y in NEIGHBOURS]
+    self.steps = [[offset for bit, offset in enumerate(offsets) if mask_bits & (1 << bit)] for mask_bits in range(1 << len(NEIGHBOURS))]
+    self.distance = [0] * (grid.cols * grid.rows)
+    self.stamp = [0] * (grid.cols * grid.rows)
+
+  def build(self, target):
+    grid = self.tile_grid
+    self.stale = False
+    if self.step_mask is None:
+      self.build_step_masks()
+    #a new generation forgets the last search without clearing the buffers
+    self.generation += 1
+    generation = self.generation
+    distance = self.distance
+    stamp = self.stamp
+    if not grid.is_walkable(target[0], target[1]):
+      return
+    start = target[1] * grid.cols + target[0]
+    distance[start] = 0
+    stamp[start] = generation
+    step_mask = self.step_mask
+    steps = self.steps
+    queue = [start]
+    head = 0
+    while head < len(queue):
+      index = queue[head]
+      head += 1
+      next_distance = distance[index] + 1
+      #cells come off the queue in distance order, so everything after this is out of range too
+      if next_distance > constants.FLOW_FIELD_RANGE:
+        break
+      for offset in steps[step_mask[index]]:
+        neighbour = index + offset
+        if stamp[neighbour] != generation:
+          stamp[neighbour] = generation
+          distance[neighbour] = next_distance
+          queue.append(neighbour)
+
+  def direction(self, rect):
+    #return the cell to head for from the rect's cell, or None if there is no path
+    if self.stale:
+      self.build(self.target)
+    grid = self.tile_grid
+    x, y = grid.cell(rect.center)
+    if not grid.is_walkable(x, y):
+      return None
+    index = y * grid.cols + x
+    stamp = self.stamp
+    if stamp is None or stamp[index] != self.generation:
+      return None
+    distance = self.distance
+    current = distance[index]
+    if current <= 0:
+      return None
+    best = None
+    mask_bits = self.step_mask[index]
+    for bit, (step_x, step_y) in enumerate(NEIGHBOURS):
+      if mask_bits & (1 << bit):
+        neighbour_index = index + step_y * grid.cols + step_x
+        if stamp[neighbour_index] == self.generation and distance[neighbour_index] < current:
+          current = distance[neighbour_index]
+          best = (x + step_x, y + step_y)
+    return best
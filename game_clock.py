@@ -0,0 +1,26 @@
+import pygame
+
+#every game timer reads the time through get_ticks so a simulation can swap in its own clock
+source = pygame.time.get_ticks
+
+def get_ticks():
+  return source()
+
+def set_source(new_source):
+  global source
+  source = new_source
+
+def reset():
+  set_source(pygame.time.get_ticks)
+
+
+class FixedClock():
+  def __init__(self, step_ms = 1000 / 60, start = 0):
+    self.step_ms = step_ms
+    self.time = start
+
+  def __call__(self):
+    return int(self.time)
+
+  def advance(self, ticks = 1):
+    self.time += self.step_ms * ticks
@@ -0,0 +1,24 @@
+import constants
+
+class InputState():
+  def __init__(self, moving_left = False, moving_right = False, moving_up = False, moving_down = False, mouse_pos = (0, 0), mouse_pressed = False):
+    self.moving_left = moving_left
+    self.moving_right = moving_right
+    self.moving_up = moving_up
+    self.moving_down = moving_down
+    self.mouse_pos = mouse_pos#screen coordinates
+    self.mouse_pressed = mouse_pressed#left mouse button
+
+  def movement(self):
+    #calculate player movement
+    dx = 0
+    dy = 0
+    if self.moving_right == True:
+      dx = constants.SPEED
+    if self.moving_left == True:
+      dx = -constants.SPEED
+    if self.moving_up == True:
+      dy = -constants.SPEED
+    if self.moving_down == True:
+      dy = constants.SPEED
+    return dx, dy
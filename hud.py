@@ -0,0 +1,44 @@
+import pygame
+import constants
+from text_cache import text_cache
+
+class Hud():
+  #info panel composed once into its own surface and only rebuilt when what it shows changes
+  def __init__(self, heart_empty, heart_half, heart_full, font):
+    self.heart_empty = heart_empty
+    self.heart_half = heart_half
+    self.heart_full = heart_full
+    self.font = font
+    #panel plus the divider line underneath it
+    self.image = pygame.Surface((constants.SCREEN_WIDTH, 51))
+    if pygame.display.get_surface() is not None:
+      self.image = self.image.convert()
+    self.shown = None
+
+  def build(self, health, score, level):
+    image = self.image
+    pygame.draw.rect(image, constants.PANEL, (0, 0, constants.SCREEN_WIDTH, 50))
+    pygame.draw.line(image, constants.WHITE, (0, 50), (constants.SCREEN_WIDTH, 50))
+    #draw lives
+    half_heart_drawn = False
+    for i in range(5):
+      if health >= ((i + 1) * 20):
+        image.blit(self.heart_full, (10 + i * 50, 0))
+      elif (health % 20 > 0) and half_heart_drawn == False:
+        image.blit(self.heart_half, (10 + i * 50, 0))
+        half_heart_drawn = True
+      else:
+        image.blit(self.heart_empty, (10 + i * 50, 0))
+
+    #level
+    image.blit(text_cache.render(self.font, "LEVEL: " + str(level), constants.WHITE), (constants.SCREEN_WIDTH / 2, 15))
+    #show score
+    image.blit(text_cache.render(self.font, f"X{score}", constants.WHITE), (constants.SCREEN_WIDTH - 100, 15))
+
+  def draw(self, surface, health, score, level):
+    #returns the screen area drawn to
+    shown = (health, score, level)
+    if shown != self.shown:
+      self.build(health, score, level)
+      self.shown = shown
+    return surface.blit(self.image, (0, 0))
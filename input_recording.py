@@ -0,0 +1,137 @@
+import struct
+from game_input import InputState
+
+#recording header: magic, format version, random seed, starting level, ticks recorded,
+#then the level, player position, health and score when it was saved so a replay can be checked against them
+HEADER = struct.Struct("<4sHIHIHiiii")
+MAGIC = b"DCIR"
+VERSION = 1
+
+#after the header comes one entry for every tick where the input changed:
+#ticks since the previous entry, a byte of flags, then how far the mouse moved if it did
+BUTTONS = ("moving_left", "moving_right", "moving_up", "moving_down", "mouse_pressed")
+MOUSE_MOVED = 1 << 5
+RESTART = 1 << 6#the game was restarted before this tick
+
+def write_number(data, value):
+  #variable length so the usual small gaps and mouse movements take a byte each, zigzag keeps negatives small too
+  value = value * 2 if value >= 0 else -value * 2 - 1
+  while value >= 0x80:
+    data.append(value & 0x7f | 0x80)
+    value >>= 7
+  data.append(value)
+
+def read_number(data, pos):
+  #returns the number and the position after it
+  value = 0
+  shift = 0
+  while True:
+    byte = data[pos]
+    pos += 1
+    value |= (byte & 0x7f) << shift
+    shift += 7
+    if byte < 0x80:
+      break
+  value = value >> 1 if value & 1 == 0 else -(value >> 1) - 1
+  return value, pos
+
+def end_state(game):
+  rect = game.player.rect
+  return game.level, rect.x, rect.y, game.player.health, game.player.score
+
+
+class InputRecorder():
+  #records the inputs given to every game step, together with the seed the game's random numbers were started from
+  def __init__(self, seed, level = 1):
+    self.seed = seed
+    self.level = level
+    self.ticks = 0
+    self.data = bytearray()
+    #the state the last entry left the inputs in, a replay starts from a blank InputState
+    self.buttons = 0
+    self.mouse_pos = (0, 0)
+    self.last_entry = 0
+    self.restarting = False
+
+  def restart(self):
+    #call when the game is restarted, it's replayed before the next recorded tick
+    self.restarting = True
+
+  def record(self, inputs):
+    #call once per tick with the inputs passed to step
+    buttons = 0
+    for bit, name in enumerate(BUTTONS):
+      if getattr(inputs, name):
+        buttons |= 1 << bit
+    flags = buttons
+    mouse_x, mouse_y = inputs.mouse_pos
+    if (mouse_x, mouse_y) != self.mouse_pos:
+      flags |= MOUSE_MOVED
+    if self.restarting:
+      flags |= RESTART
+    if buttons != self.buttons or flags & (MOUSE_MOVED | RESTART):
+      write_number(self.data, self.ticks - self.last_entry)
+      self.data.append(flags)
+      if flags & MOUSE_MOVED:
+        write_number(self.data, mouse_x - self.mouse_pos[0])
+        write_number(self.data, mouse_y - self.mouse_pos[1])
+      self.buttons = buttons
+      self.mouse_pos = (mouse_x, mouse_y)
+      self.last_entry = self.ticks
+      self.restarting = False
+    self.ticks += 1
+
+  def save(self, path, game):
+    #game is the game being recorded, its current state is stored to check replays against
+    header = HEADER.pack(MAGIC, VERSION, self.seed, self.level, self.ticks, *end_state(game))
+    with open(path, "wb") as recording_file:
+      recording_file.write(header)
+      recording_file.write(self.data)
+
+
+class InputRecording():
+  def __init__(self, seed, level, ticks, end_state, data):
+    self.seed = seed
+    self.level = level
+    self.ticks = ticks
+    self.end_state = end_state
+    self.data = data
+
+  def __len__(self):
+    return self.ticks
+
+  def __iter__(self):
+    #yields whether to restart the game before each tick and the tick's inputs, the same InputState is reused
+    inputs = InputState()
+    data = self.data
+    pos = 0
+    next_entry = -1
+    if data:
+      next_entry, pos = read_number(data, pos)
+    for tick in range(self.ticks):
+      restart = False
+      if tick == next_entry:
+        flags = data[pos]
+        pos += 1
+        for bit, name in enumerate(BUTTONS):
+          setattr(inputs, name, flags & (1 << bit) != 0)
+        if flags & MOUSE_MOVED:
+          dx, pos = read_number(data, pos)
+          dy, pos = read_number(data, pos)
+          inputs.mouse_pos = (inputs.mouse_pos[0] + dx, inputs.mouse_pos[1] + dy)
+        restart = flags & RESTART != 0
+        if pos < len(data):
+          gap, pos = read_number(data, pos)
+          next_entry = tick + gap
+      yield restart, inputs
+
+def load_recording(path):
+  with open(path, "rb") as recording_file:
+    header = recording_file.read(HEADER.size)
+    data = recording_file.read()
+  if len(header) != HEADER.size:
+    raise ValueError(f"{path} is not an input recording")
+  magic, version, seed, level, ticks, *state = HEADER.unpack(header)
+  if magic != MAGIC or version != VERSION:
+    raise ValueError(f"{path} is not an input recording or is from another version")
+  return InputRecording(seed, level, ticks, tuple(state), data)
@@ -1,49 +1,45 @@
 import pygame
+import constants
 
 class Item(pygame.sprite.Sprite):
   def __init__(self, x, y, item_type, animation_list, dummy_coin = False):
     pygame.sprite.Sprite.__init__(self)
     self.item_type = item_type#0: coin, 1: health potion
     self.animation_list = animation_list
-    self.frame_index = 0
-    self.update_time = pygame.time.get_ticks()
-    self.image = self.animation_list[self.frame_index]
+    #shared animation track and the track frame the animation started on, set by the game when the level starts
+    self.track = None
+    self.phase = 0
+    self.image = self.animation_list[0]
     self.rect = self.image.get_rect()
     self.rect.center = (x, y)
     self.dummy_coin = dummy_coin
 
-  def update(self, screen_scroll, player, coin_fx, heal_fx):
-    #doesn't apply to the dummy coin that is always displayed at the top of the screen
-    if not self.dummy_coin:
-      #reposition based on screen scroll
-      self.rect.x += screen_scroll[0]
-      self.rect.y += screen_scroll[1]
-
-    #check to see if item has been collected by the player
+  def update(self, player, events):
+    #check to see if item has been collected by the player, returns True if it was
     if self.rect.colliderect(player.rect):
       #coin collected
       if self.item_type == 0:
         player.score += 1
-        coin_fx.play()
+        events.append("coin")
       elif self.item_type == 1:
-        heal_fx.play()
-        player.health += 10
-        if player.health > 100:
-          player.health = 100
+        events.append("heal")
+        player.health += constants.POTION_HEAL
+        if player.health > constants.PLAYER_HEALTH:
+          player.health = constants.PLAYER_HEALTH
       self.kill()
+      return True
+    return False
 
-    #handle animation
-    animation_cooldown = 150
-    #update image
-    self.image = self.animation_list[self.frame_index]
-    #check if enough time has passed since the last update
-    if pygame.time.get_ticks() - self.update_time > animation_cooldown:
-      self.frame_index += 1
-      self.update_time = pygame.time.get_ticks()
-    #check if the animation has finished
-    if self.frame_index >= len(self.animation_list):
-      self.frame_index = 0
-
+  def set_track(self, track):
+    self.track = track
+    self.phase = track.frame
 
-  def draw(self, surface):
-    surface.blit(self.image, self.rect)
\ No newline at end of file
+  def draw(self, surface, camera):
+    #handle animation
+    if self.track is not None:
+      self.image = self.animation_list[(self.track.frame - self.phase) % len(self.animation_list)]
+    #the dummy coin is always displayed at the top of the screen, so it ignores the camera
+    if self.dummy_coin:
+      return surface.blit(self.image, self.rect)
+    else:
+      return surface.blit(self.image, (self.rect.x - camera.x, self.rect.y - camera.y))
\ No newline at end of file
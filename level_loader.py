@@ -0,0 +1,115 @@
+import csv
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+#compiled level header: magic, format version, bytes per tile, rows, cols, source csv mtime and size
+HEADER = struct.Struct("<4sHHIIqq")
+MAGIC = b"DODL"
+VERSION = 1
+DTYPES = {1: np.int8, 2: np.int16}
+
+def csv_path(level):
+  return f"levels/level{level}_data.csv"
+
+def cache_path(level):
+  return f"levels/level{level}_data.bin"
+
+def level_exists(level):
+  return os.path.exists(csv_path(level)) or os.path.exists(cache_path(level))
+
+def parse_csv(path):
+  with open(path, newline="") as csvfile:
+    reader = csv.reader(csvfile, delimiter = ",")
+    rows = [[int(tile) for tile in row] for row in reader if row]
+  width = max((len(row) for row in rows), default = 0)
+  #pad short rows with empty tiles
+  data = np.full((len(rows), width), -1, dtype = np.int16)
+  for y, row in enumerate(rows):
+    data[y, :len(row)] = row
+  return data
+
+def read_cache(path, source_stat):
+  #return the memory-mapped grid, or None if the cache is missing, from another version or older than the csv
+  try:
+    with open(path, "rb") as cache_file:
+      header = cache_file.read(HEADER.size)
+      file_size = os.fstat(cache_file.fileno()).st_size
+  except OSError:
+    return None
+  if len(header) != HEADER.size:
+    return None
+  magic, version, tile_bytes, rows, cols, mtime, size = HEADER.unpack(header)
+  if magic != MAGIC or version != VERSION or tile_bytes not in DTYPES:
+    return None
+  if source_stat is not None and (mtime != source_stat.st_mtime_ns or size != source_stat.st_size):
+    return None
+  #a truncated file, e.g. from a write that didn't finish
+  if file_size != HEADER.size + rows * cols * tile_bytes:
+    return None
+  if rows == 0 or cols == 0:
+    return np.zeros((rows, cols), dtype = DTYPES[tile_bytes])
+  return np.memmap(path, dtype = DTYPES[tile_bytes], mode = "r", offset = HEADER.size, shape = (rows, cols))
+
+def write_cache(path, data, source_stat):
+  #use one byte per tile unless the level has tile ids that don't fit
+  tile_bytes = 1 if data.size == 0 or (data.min() >= -128 and data.max() <= 127) else 2
+  header = HEADER.pack(MAGIC, VERSION, tile_bytes, data.shape[0], data.shape[1], source_stat.st_mtime_ns, source_stat.st_size)
+  #each process writes its own temp file so parallel simulations can't interleave writes
+  temp_path = f"{path}.{os.getpid()}.tmp"
+  try:
+    with open(temp_path, "wb") as cache_file:
+      cache_file.write(header)
+      cache_file.write(data.astype(DTYPES[tile_bytes]).tobytes())
+    os.replace(temp_path, path)
+  except OSError:
+    #the cache is only an optimisation, so a read-only level folder is fine
+    pass
+
+def load_level(level):
+  #return the level's tile grid as a (rows, cols) array, compiling the csv into a binary cache the first time
+  source = csv_path(level)
+  try:
+    source_stat = os.stat(source)
+  except OSError:
+    source_stat = None
+  data = read_cache(cache_path(level), source_stat)
+  if data is None:
+    if source_stat is None:
+      raise FileNotFoundError(source)
+    data = parse_csv(source)
+    write_cache(cache_path(level), data, source_stat)
+  return data
+
+
+class LevelPrefetcher():
+  def __init__(self, build):
+    #build(level) returns a ready to play world, it runs on a single worker thread
+    self.build = build
+    self.executor = ThreadPoolExecutor(max_workers = 1)
+    self.pending = {}
+
+  def prefetch(self, level):
+    #start building a copy of the level in the background unless one is already waiting
+    if level not in self.pending and level_exists(level):
+      self.pending[level] = self.executor.submit(self.build, level)
+
+  def keep(self, levels):
+    #drop the copies of any other levels, builds that haven't started are cancelled
+    for level in list(self.pending):
+      if level not in levels:
+        self.pending.pop(level).cancel()
+
+  def take(self, level):
+    #hand over the prebuilt copy, building it now if it was never prefetched
+    future = self.pending.pop(level, None)
+    if future is None:
+      return self.build(level)
+    return future.result()
+
+  def shutdown(self):
+    for future in self.pending.values():
+      future.cancel()
+    self.pending = {}
+    self.executor.shutdown()
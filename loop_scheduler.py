@@ -0,0 +1,30 @@
+import constants
+
+class FixedStepLoop():
+  #runs the game logic at a fixed tick rate whatever rate frames are drawn at
+  def __init__(self, tick_rate = constants.FPS, max_substeps = constants.MAX_SUBSTEPS):
+    self.step_ms = 1000 / tick_rate
+    self.max_substeps = max_substeps
+    #real time not yet simulated
+    self.accumulator = 0
+
+  def reset(self):
+    #forget time spent outside the game, e.g. in a menu, so it isn't caught up afterwards
+    self.accumulator = 0
+
+  def advance(self, elapsed_ms):
+    #returns how many ticks to run for the time since the last frame
+    self.accumulator += elapsed_ms
+    ticks = int(self.accumulator // self.step_ms)
+    if ticks > self.max_substeps:
+      #after a stall only catch up a few ticks and drop the rest, so slow frames can't snowball
+      ticks = self.max_substeps
+      self.accumulator %= self.step_ms
+    else:
+      self.accumulator -= ticks * self.step_ms
+    return ticks
+
+  @property
+  def alpha(self):
+    #how far between the last two ticks the current frame is, used to blend positions when drawing
+    return min(self.accumulator / self.step_ms, 1.0)
@@ -1,11 +1,17 @@
 import pygame
+import random
 from pygame import mixer
-import csv
 import constants
-from weapon import Weapon
-from items import Item
-from world import World
+import game_clock
 from button import Button
+from asset_pack import AssetPack
+from engine import Game
+from game_input import InputState
+from profiler import FrameProfiler
+from dirty_rects import DirtyRects
+from hud import Hud
+from loop_scheduler import FixedStepLoop
+from input_recording import InputRecorder
 
 mixer.init()
 pygame.init()
@@ -15,28 +21,29 @@ pygame.display.set_caption("Dungeon Crawler")
 
 #create clock for maintaining frame rate
 clock = pygame.time.Clock()
+#game logic runs in fixed ticks and game timers count ticks, so a slow frame never changes how the game plays
+loop = FixedStepLoop()
+tick_clock = game_clock.FixedClock(loop.step_ms)
+game_clock.set_source(tick_clock)
+
+#track the parts of the screen that change so only those are sent to the display
+display = DirtyRects()
 
 #define game variables
 level = 1
 start_game = False
 pause_game = False
 start_intro = False
-scren_scroll = [0, 0]
 
-#define player movement variables
-moving_left = False
-moving_right = False
-moving_up = False
-moving_down = False
+#define player input, movement keys are tracked from keyboard events
+inputs = InputState()
 
 #define font
 font = pygame.font.Font("assets/fonts/AtariClassic.ttf", 20)
+profiler_font = pygame.font.Font("assets/fonts/AtariClassic.ttf", 10)
 
-#helper function to scale image
-def scale_img(image, scale):
-  w = image.get_width()
-  h = image.get_height()
-  return pygame.transform.scale(image, (w * scale, h * scale))
+#frame profiler, F3 toggles it and its overlay, F4 saves the recorded frames to a trace file
+profiler = FrameProfiler()
 
 # load music and sounds
 
@@ -52,122 +59,25 @@ coin_fx = mixer.Sound("assets/audio/coin.wav")
 coin_fx.set_volume(0.5)
 heal_fx = mixer.Sound("assets/audio/heal.wav")
 heal_fx.set_volume(0.5)
+sounds = {"shot": shot_fx, "hit": hit_fx, "coin": coin_fx, "heal": heal_fx}
+
 
+#load all sprites from the asset manifest
+assets = AssetPack()
 
 # load button images
-restart_img = scale_img(pygame.image.load("assets/images/buttons/button_restart.png").convert_alpha(), constants.BUTTON_SCALE)
-exit_img = scale_img(pygame.image.load("assets/images/buttons/button_exit.png").convert_alpha(), constants.BUTTON_SCALE)
-resume_img = scale_img(pygame.image.load("assets/images/buttons/button_resume.png").convert_alpha(), constants.BUTTON_SCALE)
-start_img = scale_img(pygame.image.load("assets/images/buttons/button_start.png").convert_alpha(), constants.BUTTON_SCALE)
+restart_img = assets.image("button_restart")
+exit_img = assets.image("button_exit")
+resume_img = assets.image("button_resume")
+start_img = assets.image("button_start")
 
 #load heart images
-heart_empty = scale_img(pygame.image.load("assets/images/items/heart_empty.png").convert_alpha(), constants.ITEM_SCALE)
-heart_half = scale_img(pygame.image.load("assets/images/items/heart_half.png").convert_alpha(), constants.ITEM_SCALE)
-heart_full = scale_img(pygame.image.load("assets/images/items/heart_full.png").convert_alpha(), constants.ITEM_SCALE)
-
-#load coin images
-coin_images = []
-for x in range(4):
-  img = scale_img(pygame.image.load(f"assets/images/items/coin_f{x}.png").convert_alpha(), constants.ITEM_SCALE)
-  coin_images.append(img)
-
-#load potion image
-red_potion = scale_img(pygame.image.load("assets/images/items/potion_red.png").convert_alpha(), constants.POTION_SCALE)
-
-item_images = []
-item_images.append(coin_images)
-item_images.append(red_potion)
-
-#load weapon images
-bow_image = scale_img(pygame.image.load("assets/images/weapons/bow.png").convert_alpha(), constants.WEAPON_SCALE)
-arrow_image = scale_img(pygame.image.load("assets/images/weapons/arrow.png").convert_alpha(), constants.WEAPON_SCALE)
-fireball_image = scale_img(pygame.image.load("assets/images/weapons/fireball.png").convert_alpha(), constants.FIREBALL_SCALE)
-
-#load tilemap images
-tile_list = []
-for x in range(constants.TILE_TYPES):
-  tile_image = pygame.image.load(f"assets/images/tiles/{x}.png").convert_alpha()
-  tile_image = pygame.transform.scale(tile_image, (constants.TILE_SIZE, constants.TILE_SIZE))
-  tile_list.append(tile_image)
-
-#load character images
-mob_animations = []
-mob_types = ["elf", "imp", "skeleton", "goblin", "muddy", "tiny_zombie", "big_demon"]
-
-animation_types = ["idle", "run"]
-for mob in mob_types:
-  #load images
-  animation_list = []
-  for animation in animation_types:
-    #reset temporary list of images
-    temp_list = []
-    for i in range(4):
-      img = pygame.image.load(f"assets/images/characters/{mob}/{animation}/{i}.png").convert_alpha()
-      img = scale_img(img, constants.SCALE)
-      temp_list.append(img)
-    animation_list.append(temp_list)
-  mob_animations.append(animation_list)
-
-#function for outputting text onto the screen
-def draw_text(text, font, text_col, x, y):
-  img = font.render(text, True, text_col)
-  screen.blit(img, (x, y))
-
-#function for displaying game info
-def draw_info():
-  pygame.draw.rect(screen, constants.PANEL, (0, 0, constants.SCREEN_WIDTH, 50))
-  pygame.draw.line(screen, constants.WHITE, (0, 50), (constants.SCREEN_WIDTH, 50))
-  #draw lives
-  half_heart_drawn = False
-  for i in range(5):
-    if player.health >= ((i + 1) * 20):
-      screen.blit(heart_full, (10 + i * 50, 0))
-    elif (player.health % 20 > 0) and half_heart_drawn == False:
-      screen.blit(heart_half, (10 + i * 50, 0))
-      half_heart_drawn = True
-    else:
-      screen.blit(heart_empty, (10 + i * 50, 0))
-
-  #level
-  draw_text("LEVEL: " + str(level), font, constants.WHITE, constants.SCREEN_WIDTH / 2, 15)
-  #show score
-  draw_text(f"X{player.score}", font, constants.WHITE, constants.SCREEN_WIDTH - 100, 15)
-
-#function to reset level
-def reset_level():
-  damage_text_group.empty()
-  arrow_group.empty()
-  item_group.empty()
-  fireball_group.empty()
-
-  #create empty tile list
-  data = []
-  for row in range(constants.ROWS):
-    r = [-1] * constants.COLS
-    data.append(r)
-
-  return data
-
-#damage text class
-class DamageText(pygame.sprite.Sprite):
-  def __init__(self, x, y, damage, color):
-    pygame.sprite.Sprite.__init__(self)
-    self.image = font.render(damage, True, color)
-    self.rect = self.image.get_rect()
-    self.rect.center = (x, y)
-    self.counter = 0
-
-  def update(self):
-    #reposition based on screen scroll
-    self.rect.x += screen_scroll[0]
-    self.rect.y += screen_scroll[1]
-    
-    #move damage text up
-    self.rect.y -= 1
-    #delete the damage text after a few seconds
-    self.counter += 1
-    if self.counter > 30:
-      self.kill()
+heart_empty = assets.image("heart_empty")
+heart_half = assets.image("heart_half")
+heart_full = assets.image("heart_full")
+
+#info panel at the top of the screen, only redrawn when health, score or level change
+hud = Hud(heart_empty, heart_half, heart_full, font)
 
 # screen fade class
 class ScreenFade():
@@ -176,9 +86,9 @@ class ScreenFade():
     self.color = color
     self.speed = speed
     self.fade_counter = 0
-  def fade(self):
+  def fade(self, ticks = 1):
     fade_complete = False
-    self.fade_counter += self.speed
+    self.fade_counter += self.speed * ticks
     if self.direction == 1: #whole screen fade
       pygame.draw.rect(screen, self.color, (0 - self.fade_counter,0, constants.SCREEN_WIDTH // 2, constants.SCREEN_HEIGHT))
       pygame.draw.rect(screen, self.color, (constants.SCREEN_WIDTH // 2 + self.fade_counter, 0,constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT ))
@@ -193,40 +103,14 @@ class ScreenFade():
     
     
 
-#create empty tile list
-world_data = []
-for row in range(constants.ROWS):
-  r = [-1] * constants.COLS
-  world_data.append(r)
-#load in level data and create world
-with open(f"levels/level{level}_data.csv", newline="") as csvfile:
-  reader = csv.reader(csvfile, delimiter = ",")
-  for x, row in enumerate(reader):
-    for y, tile in enumerate(row):
-      world_data[x][y] = int(tile)
-
-world = World()
-world.process_data(world_data, tile_list, item_images, mob_animations)
-
-#create player
-player = world.player
-#create player's weapon
-bow = Weapon(bow_image, arrow_image)
-
-#extract enemies from world data
-enemy_list = world.character_list
-
-#create sprite groups
-damage_text_group = pygame.sprite.Group()
-arrow_group = pygame.sprite.Group()
-item_group = pygame.sprite.Group()
-fireball_group = pygame.sprite.Group()
-
-score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, coin_images, True)
-item_group.add(score_coin)
-#add the items from the level data
-for item in world.item_list:
-  item_group.add(item)
+#seed the random numbers so the session can be replayed from its input recording
+seed = random.randrange(2 ** 32)
+random.seed(seed)
+#the inputs of every game tick are recorded, F5 saves the recording so far for replay.py
+recorder = InputRecorder(seed, level)
+
+#create the game and load in the first level
+game = Game(assets, level, font, profiler = profiler)
 
 # create screen fades
 intro_fade = ScreenFade(1, constants.BLACK,4)
@@ -238,171 +122,145 @@ exit_button = Button(constants.SCREEN_WIDTH // 2 - 110, constants.SCREEN_HEIGHT
 restart_button = Button(constants.SCREEN_WIDTH // 2 - 175, constants.SCREEN_HEIGHT //2 -50, restart_img)
 resume_button = Button(constants.SCREEN_WIDTH // 2 - 175, constants.SCREEN_HEIGHT //2 -150, resume_img)
 
+#world and camera position shown last frame, the background needs a full update when either changes
+last_view = None
+
+#events from the last frame, the buttons check them for clicks
+events = []
+
 #main game loop
 run = True
 while run:
 
+  profiler.begin_frame()
   #control frame rate
-  clock.tick(constants.FPS)
+  elapsed = clock.tick(constants.RENDER_FPS)
+  profiler.mark("wait")
   if not start_game:
     # render main menu
+    loop.reset()
+    display.invalidate()
     screen.fill(constants.MENU_BG)
-    if start_button.draw(screen):
+    if start_button.draw(screen, events):
       start_game = True
       start_intro = True
-    if exit_button.draw(screen):
+    if exit_button.draw(screen, events):
       run = False
   else:
 
     if pause_game == True:
+      loop.reset()
+      display.invalidate()
       screen.fill(constants.MENU_BG)
-      if resume_button.draw(screen):
+      if resume_button.draw(screen, events):
         pause_game = False
-      if exit_button.draw(screen):
+      if exit_button.draw(screen, events):
         run = False
     else:
       screen.fill(constants.BG)
 
-      if player.alive:
-        #calculate player movement
-        dx = 0
-        dy = 0
-        if moving_right == True:
-          dx = constants.SPEED
-        if moving_left == True:
-          dx = -constants.SPEED
-        if moving_up == True:
-          dy = -constants.SPEED
-        if moving_down == True:
-          dy = constants.SPEED
-
-        #move player
-        screen_scroll, level_complete = player.move(dx, dy, world.obstacle_tiles, world.exit_tile)
-
-        #update all objects
-        world.update(screen_scroll)
-        for enemy in enemy_list:
-          fireball = enemy.ai(player, world.obstacle_tiles, screen_scroll, fireball_image)
-          if fireball:
-            fireball_group.add(fireball)
-          if enemy.alive:
-            enemy.update()
-        player.update()
-        arrow = bow.update(player)
-        if arrow:
-          arrow_group.add(arrow)
-          shot_fx.play()
-        for arrow in arrow_group:
-          damage, damage_pos = arrow.update(screen_scroll, world.obstacle_tiles, enemy_list)
-          if damage:
-            hit_fx.play()
-            damage_text = DamageText(damage_pos.centerx, damage_pos.y, str(damage), constants.RED)
-            damage_text_group.add(damage_text)
-        damage_text_group.update()
-        fireball_group.update(screen_scroll, player)
-        item_group.update(screen_scroll, player, coin_fx, heal_fx)
-
-      #draw player on screen
-      world.draw(screen)
-      for enemy in enemy_list:
-        enemy.draw(screen)
-      player.draw(screen)
-      bow.draw(screen)
-      for arrow in arrow_group:
-        arrow.draw(screen)
-      for fireball in fireball_group:
-        fireball.draw(screen)
-      damage_text_group.draw(screen)
-      item_group.draw(screen)
-      draw_info()
-      score_coin.draw(screen)
-
-      #check level complete
-      if level_complete == True:
-        start_intro = True
-        level += 1
-        world_data = reset_level()
-        #load in level data and create world
-        with open(f"levels/level{level}_data.csv", newline="") as csvfile:
-          reader = csv.reader(csvfile, delimiter = ",")
-          for x, row in enumerate(reader):
-            for y, tile in enumerate(row):
-              world_data[x][y] = int(tile)
-        world = World()
-        world.process_data(world_data, tile_list, item_images, mob_animations)
-        temp_hp = player.health
-        temp_score = player.score
-        player = world.player
-        player.health = temp_hp
-        player.score = temp_score
-        enemy_list = world.character_list
-        score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, coin_images, True)
-        item_group.add(score_coin)
-        #add the items from the level data
-        for item in world.item_list:
-          item_group.add(item)
+      #run as many ticks as the time since the last frame covers
+      ticks = loop.advance(elapsed)
+      if game.player.alive and ticks:
+        #read the mouse for aiming and shooting
+        inputs.mouse_pos = pygame.mouse.get_pos()
+        inputs.mouse_pressed = pygame.mouse.get_pressed()[0]
+        profiler.mark("input")
+        for tick in range(ticks):
+          #update all objects
+          recorder.record(inputs)
+          if game.step(inputs):
+            start_intro = True
+            if game.game_complete:
+              run = False
+          tick_clock.advance()
+          #play sounds for anything that happened this tick
+          for event in game.events:
+            sounds[event].play()
+          profiler.mark("sounds")
+          if not run or not game.player.alive:
+            break
+
+      #draw everything on screen, the camera is blended between ticks like everything else
+      #once the player dies no more ticks run, so draw the last tick as it is instead of blending
+      alpha = loop.alpha if game.player.alive else 1.0
+      camera = game.camera.interpolated(alpha)
+      view = (game.world, camera.x, camera.y)
+      if view != last_view:
+        display.invalidate()
+        last_view = view
+      display.extend(game.draw(screen, alpha))
+      display.add(hud.draw(screen, game.player.health, game.player.score, game.level))
+      #the coin is animated so it goes on top of the panel every frame
+      game.score_coin.draw(screen, game.camera)
+      profiler.mark("draw_hud")
 
     # show intro
       if start_intro:
-        if intro_fade.fade():
+        display.invalidate()
+        if intro_fade.fade(ticks):
           start_intro = False
           intro_fade.fade_counter = 0
 
     # show death screen
-      if not player.alive:
-        if death_fade.fade():
-          if restart_button.draw(screen):
-
+      if not game.player.alive:
+        display.invalidate()
+        if death_fade.fade(ticks):
+          if restart_button.draw(screen, events):
             death_fade.fade_counter = 0
             start_intro = True
-            world_data = reset_level()
-            #load in level data and create world
-            with open(f"levels/level{level}_data.csv", newline="") as csvfile:
-              reader = csv.reader(csvfile, delimiter = ",")
-              for x, row in enumerate(reader):
-                for y, tile in enumerate(row):
-                  world_data[x][y] = int(tile)
-            world = World()
-            world.process_data(world_data, tile_list, item_images, mob_animations)
-            temp_score = player.score
-            player = world.player
-            player.score = temp_score
-            enemy_list = world.character_list
-            score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, coin_images, True)
-            item_group.add(score_coin)
-            #add the items from the level data
-            for item in world.item_list:
-              item_group.add(item)
-        
+            game.restart()
+            recorder.restart()
+      profiler.mark("fades")
+
+  if profiler.enabled:
+    display.add(profiler.draw(screen, profiler_font))
+    profiler.mark("overlay")
+  display.update()
+  profiler.mark("display_update")
+
+  #menus and the finished death screen only change when something happens, so sleep until the next event instead of polling
+  idle = run and (not start_game or pause_game or (not game.player.alive and death_fade.fade_counter >= constants.SCREEN_WIDTH))
+  if idle:
+    events = [pygame.event.wait()] + pygame.event.get()
+    profiler.mark("idle")
+  else:
+    events = pygame.event.get()
 
   #event handler
-  for event in pygame.event.get():
+  for event in events:
     if event.type == pygame.QUIT:
       run = False
     #take keyboard presses
     if event.type == pygame.KEYDOWN:
       if event.key == pygame.K_a:
-        moving_left = True
+        inputs.moving_left = True
       if event.key == pygame.K_d:
-        moving_right = True
+        inputs.moving_right = True
       if event.key == pygame.K_w:
-        moving_up = True
+        inputs.moving_up = True
       if event.key == pygame.K_s:
-        moving_down = True
+        inputs.moving_down = True
       if event.key == pygame.K_ESCAPE:
         pause_game = True
+      if event.key == pygame.K_F3:
+        profiler.toggle()
+      if event.key == pygame.K_F4 and profiler.enabled:
+        profiler.save_trace("profile_trace.json")
+      if event.key == pygame.K_F5:
+        recorder.save("input_recording.rec", game)
 
     #keyboard button released
     if event.type == pygame.KEYUP:
       if event.key == pygame.K_a:
-        moving_left = False
+        inputs.moving_left = False
       if event.key == pygame.K_d:
-        moving_right = False
+        inputs.moving_right = False
       if event.key == pygame.K_w:
-        moving_up = False
+        inputs.moving_up = False
       if event.key == pygame.K_s:
-        moving_down = False
-
-  pygame.display.update()
+        inputs.moving_down = False
+  profiler.mark("events")
 
+game.shutdown()
 pygame.quit()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import csv
+import json
+import time
+from collections import deque
+import pygame
+import constants
+
+class FrameProfiler():
+  def __init__(self, history = 120, trace_frames = 3600):
+    self.enabled = False
+    self.history = history#frames used for the overlay averages
+    #finished frames as (frame start, [(phase, start, duration), ...]), oldest dropped first
+    self.frames = deque(maxlen = trace_frames)
+    self.current = None
+    self.frame_start = 0
+    self.last = 0
+
+  def toggle(self):
+    self.enabled = not self.enabled
+    self.current = None
+    if self.enabled:
+      self.frames.clear()
+
+  def begin_frame(self):
+    if not self.enabled:
+      return
+    now = time.perf_counter()
+    if self.current is not None:
+      self.frames.append((self.frame_start, self.current))
+    self.frame_start = now
+    self.last = now
+    self.current = []
+
+  def mark(self, phase):
+    #record the time since the previous mark against this phase, costs one check when disabled
+    if not self.enabled or self.current is None:
+      return
+    now = time.perf_counter()
+    self.current.append((phase, self.last, now - self.last))
+    self.last = now
+
+  def stats(self):
+    #average and worst time per phase over the recent frames, in milliseconds, plus whole frames
+    recent = list(self.frames)[-self.history:]
+    totals = {}
+    for frame_start, phases in recent:
+      frame_phases = {}
+      for phase, start, duration in phases:
+        frame_phases[phase] = frame_phases.get(phase, 0) + duration
+      frame_phases["frame"] = sum(duration for phase, start, duration in phases)
+      for phase, duration in frame_phases.items():
+        totals.setdefault(phase, []).append(duration * 1000)
+    return {phase: (sum(samples) / len(recent), max(samples)) for phase, samples in totals.items()}
+
+  def draw(self, surface, font):
+    stats = self.stats()
+    lines = [f"{'PHASE':<18}{'AVG':>7}{'MAX':>7}"]
+    for phase, (average, worst) in sorted(stats.items(), key = lambda item: -item[1][0]):
+      lines.append(f"{phase[:18]:<18}{average:7.2f}{worst:7.2f}")
+    line_height = font.get_linesize()
+    panel = pygame.Surface((constants.SCREEN_WIDTH // 2, line_height * len(lines) + 10))
+    panel.set_alpha(200)
+    panel.fill(constants.BLACK)
+    for i, line in enumerate(lines):
+      panel.blit(font.render(line, True, constants.WHITE), (5, 5 + i * line_height))
+    return surface.blit(panel, (0, 60))
+
+  def save_trace(self, path):
+    #csv gets one row per phase per frame, anything else is written as a chrome://tracing json file
+    frames = list(self.frames)
+    if path.endswith(".csv"):
+      with open(path, "w", newline = "") as trace_file:
+        writer = csv.writer(trace_file)
+        writer.writerow(["frame", "phase", "start_ms", "duration_ms"])
+        for frame, (frame_start, phases) in enumerate(frames):
+          for phase, start, duration in phases:
+            writer.writerow([frame, phase, f"{(start - frame_start) * 1000:.4f}", f"{duration * 1000:.4f}"])
+    else:
+      origin = frames[0][0] if frames else 0
+      events = []
+      for frame, (frame_start, phases) in enumerate(frames):
+        events.append({"name": f"frame {frame}", "ph": "X", "pid": 0, "tid": 0,
+          "ts": (frame_start - origin) * 1e6, "dur": sum(duration for phase, start, duration in phases) * 1e6})
+        for phase, start, duration in phases:
+          events.append({"name": phase, "ph": "X", "pid": 0, "tid": 1, "ts": (start - origin) * 1e6, "dur": duration * 1e6})
+      with open(path, "w") as trace_file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+    return len(frames)
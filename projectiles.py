@@ -0,0 +1,161 @@
+import random
+import numpy as np
+import constants
+import game_clock
+
+#who fired a projectile, which decides what it can hit
+OWNER_PLAYER = 0
+OWNER_ENEMY = 1
+
+class ProjectileGroup():
+  def __init__(self, capacity = 64):
+    self.count = 0
+    self.allocate(capacity)
+    #surfaces can't live in an array so they are kept in a list in the same order
+    self.images = []
+
+  def allocate(self, capacity):
+    self.x = np.zeros(capacity)
+    self.y = np.zeros(capacity)
+    #position at the start of the current tick
+    self.prev_x = np.zeros(capacity)
+    self.prev_y = np.zeros(capacity)
+    self.dx = np.zeros(capacity)
+    self.dy = np.zeros(capacity)
+    self.angle = np.zeros(capacity)
+    self.width = np.zeros(capacity, dtype = np.int32)
+    self.height = np.zeros(capacity, dtype = np.int32)
+    self.owner = np.zeros(capacity, dtype = np.int8)
+
+  def grow(self):
+    count = self.count
+    old = self.arrays()
+    self.allocate(len(self.x) * 2)
+    for new_array, old_array in zip(self.arrays(), old):
+      new_array[:count] = old_array[:count]
+
+  def arrays(self):
+    return (self.x, self.y, self.prev_x, self.prev_y, self.dx, self.dy, self.angle, self.width, self.height, self.owner)
+
+  def __len__(self):
+    return self.count
+
+  def add(self, projectile):
+    if self.count == len(self.x):
+      self.grow()
+    i = self.count
+    self.x[i], self.y[i] = projectile.rect.center
+    self.prev_x[i] = self.x[i]
+    self.prev_y[i] = self.y[i]
+    self.dx[i] = projectile.dx
+    self.dy[i] = projectile.dy
+    self.angle[i] = projectile.angle
+    self.width[i], self.height[i] = projectile.rect.size
+    self.owner[i] = projectile.owner
+    self.images.append(projectile.image)
+    self.count += 1
+
+  def empty(self):
+    self.count = 0
+    self.images = []
+
+  def rects(self):
+    #integer rect edges matching pygame.Rect with its center at the projectile position
+    n = self.count
+    left = np.floor(self.x[:n]).astype(np.int32) - self.width[:n] // 2
+    top = np.floor(self.y[:n]).astype(np.int32) - self.height[:n] // 2
+    return left, top, left + self.width[:n], top + self.height[:n]
+
+  def update(self, camera, tile_grid, player, enemy_list):
+    #returns (damage, enemy rect) for every hit on an enemy this frame
+    hits = []
+    n = self.count
+    if n == 0:
+      return hits
+
+    #reposition based on speed
+    self.x[:n] += self.dx[:n]
+    self.y[:n] += self.dy[:n]
+    left, top, right, bottom = self.rects()
+    player_owned = self.owner[:n] == OWNER_PLAYER
+
+    #check if projectiles have gone off screen
+    kill = ~((right > camera.x) & (left < camera.x + constants.SCREEN_WIDTH) & (bottom > camera.y) & (top < camera.y + constants.SCREEN_HEIGHT))
+
+    #check for collision between arrows and tile walls, fireballs pass through walls
+    kill |= player_owned & self.hit_walls(tile_grid, left, top, right, bottom)
+
+    #check collision between arrows and enemies, each arrow hits the first living enemy it touches
+    #enemy_list is the level's EntityStore so its columns are read directly
+    if enemy_list and player_owned.any():
+      enemy_left, enemy_top, enemy_right, enemy_bottom = enemy_list.rects()
+      alive = enemy_list.column("alive") != 0
+      touching = ((left[:, None] < enemy_right) & (enemy_left < right[:, None])
+        & (top[:, None] < enemy_bottom) & (enemy_top < bottom[:, None]) & alive & player_owned[:, None])
+      hit_any = touching.any(axis = 1)
+      first_hit = touching.argmax(axis = 1)
+      for i in np.flatnonzero(hit_any):
+        enemy = enemy_list[first_hit[i]]
+        damage = 10 + random.randint(-5, 5)
+        enemy.health -= damage
+        enemy.hit = True
+        hits.append((damage, enemy.rect))
+      kill |= hit_any
+
+    #check collision between fireballs and the player, only one can land while the player is recovering
+    if not player.hit and not player_owned.all():
+      touching = ((left < player.rect.right) & (player.rect.left < right)
+        & (top < player.rect.bottom) & (player.rect.top < bottom) & ~player_owned)
+      if touching.any():
+        player.hit = True
+        player.last_hit = game_clock.get_ticks()
+        player.health -= 10
+        kill[touching.argmax()] = True
+
+    if kill.any():
+      self.remove(kill)
+    return hits
+
+  def hit_walls(self, tile_grid, left, top, right, bottom):
+    #look up the wall cells under each rect, every cell it overlaps is covered by stepping a tile at a time
+    half = constants.TILE_SIZE // 2
+    first_col = (left + half) // constants.TILE_SIZE
+    last_col = (right - 1 + half) // constants.TILE_SIZE
+    first_row = (top + half) // constants.TILE_SIZE
+    last_row = (bottom - 1 + half) // constants.TILE_SIZE
+    span_x = int((last_col - first_col).max()) + 1
+    span_y = int((last_row - first_row).max()) + 1
+    hit = np.zeros(len(left), dtype = bool)
+    for step_y in range(span_y):
+      row = np.minimum(first_row + step_y, last_row)
+      for step_x in range(span_x):
+        col = np.minimum(first_col + step_x, last_col)
+        inside = (col >= 0) & (row >= 0) & (col < tile_grid.cols) & (row < tile_grid.rows)
+        hit[inside] |= tile_grid.wall_mask[row[inside], col[inside]]
+    return hit
+
+  def remove(self, kill):
+    n = self.count
+    keep = ~kill
+    count = int(keep.sum())
+    for array in self.arrays():
+      array[:count] = array[:n][keep]
+    self.images = [image for image, kept in zip(self.images, keep) if kept]
+    self.count = count
+
+  def remember(self):
+    #keep this tick's positions so drawing can blend towards the next
+    n = self.count
+    self.prev_x[:n] = self.x[:n]
+    self.prev_y[:n] = self.y[:n]
+
+  def draw(self, surface, camera, alpha = 1.0):
+    n = self.count
+    x = self.x[:n]
+    y = self.y[:n]
+    if alpha < 1:
+      x = self.prev_x[:n] + (x - self.prev_x[:n]) * alpha
+      y = self.prev_y[:n] + (y - self.prev_y[:n]) * alpha
+    left = (np.floor(x).astype(np.int32) - self.width[:n] // 2 - camera.x).tolist()
+    top = (np.floor(y).astype(np.int32) - self.height[:n] // 2 - camera.y).tolist()
+    return surface.blits(list(zip(self.images, zip(left, top))))
@@ -0,0 +1,99 @@
+import argparse
+import json
+import random
+import time
+import constants
+import game_clock
+from asset_pack import AssetPack
+from engine import Game
+from input_recording import load_recording, end_state
+
+def replay(recording, assets = None):
+  #re-run a recording headless as fast as possible, the game plays out exactly as it did when recorded
+  random.seed(recording.seed)
+  clock = game_clock.FixedClock(1000 / constants.FPS)
+  game_clock.set_source(clock)
+  try:
+    game = Game(assets or AssetPack(), recording.level, prefetch = False, render = False)
+    start = time.perf_counter()
+    for restart, inputs in recording:
+      if restart:
+        game.restart()
+      game.step(inputs)
+      clock.advance()
+    elapsed = time.perf_counter() - start
+    return {
+      "ticks": len(recording),
+      "level": game.level,
+      "alive": game.player.alive,
+      "health": game.player.health,
+      "score": game.player.score,
+      #whether the game ended up where it was when the recording was saved
+      "matches": end_state(game) == recording.end_state,
+      "seconds": elapsed,
+      "ticks_per_second": len(recording) / elapsed if elapsed > 0 else 0,
+    }
+  finally:
+    game_clock.reset()
+
+def watch(recording):
+  #play a recording back in a window at normal speed, closing the window or escape stops it
+  import pygame
+  from hud import Hud
+  from loop_scheduler import FixedStepLoop
+  pygame.init()
+  screen = pygame.display.set_mode((constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT))
+  pygame.display.set_caption("Dungeon Crawler replay")
+  font = pygame.font.Font("assets/fonts/AtariClassic.ttf", 20)
+  assets = AssetPack()
+  hud = Hud(assets.image("heart_empty"), assets.image("heart_half"), assets.image("heart_full"), font)
+
+  random.seed(recording.seed)
+  loop = FixedStepLoop()
+  tick_clock = game_clock.FixedClock(loop.step_ms)
+  game_clock.set_source(tick_clock)
+  clock = pygame.time.Clock()
+  game = Game(assets, recording.level, font)
+  ticks = iter(recording)
+  played = 0
+  run = True
+  while run:
+    elapsed = clock.tick(constants.RENDER_FPS)
+    for tick in range(loop.advance(elapsed)):
+      step = next(ticks, None)
+      if step is None:
+        run = False
+        break
+      restart, inputs = step
+      if restart:
+        game.restart()
+      game.step(inputs)
+      tick_clock.advance()
+      played += 1
+
+    screen.fill(constants.BG)
+    game.draw(screen, loop.alpha)
+    hud.draw(screen, game.player.health, game.player.score, game.level)
+    game.score_coin.draw(screen, game.camera)
+    pygame.display.update()
+
+    for event in pygame.event.get():
+      if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+        run = False
+  result = {
+    "ticks": played,
+    "matches": played == len(recording) and end_state(game) == recording.end_state,
+  }
+  game.shutdown()
+  game_clock.reset()
+  pygame.quit()
+  return result
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description = "Play back an input recording saved from the game with F5")
+  parser.add_argument("recording")
+  parser.add_argument("--watch", action = "store_true", help = "show the replay in a window at normal speed instead of running it headless")
+  args = parser.parse_args()
+  recording = load_recording(args.recording)
+  result = watch(recording) if args.watch else replay(recording)
+  print(json.dumps(result, indent = 2))
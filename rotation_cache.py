@@ -0,0 +1,27 @@
+import pygame
+import constants
+
+class RotationCache():
+  def __init__(self, image, steps = constants.ROTATION_STEPS, preload = False):
+    self.original_image = image
+    self.steps = steps
+    #rotated frames are rendered the first time each step is asked for, so memory is capped at steps frames
+    self.frames = [None] * steps
+    if preload:
+      for i in range(steps):
+        self.render(i)
+
+  def render(self, i):
+    image = pygame.transform.rotate(self.original_image, i * 360 / self.steps)
+    #offset from the centre of the image to its top left corner
+    offset = (-int(image.get_width() / 2), -int(image.get_height() / 2))
+    self.frames[i] = (image, offset)
+    return self.frames[i]
+
+  def get(self, angle):
+    #return the rotated image closest to angle (in degrees) and its offset
+    i = round(angle * self.steps / 360) % self.steps
+    frame = self.frames[i]
+    if frame is None:
+      frame = self.render(i)
+    return frame
@@ -0,0 +1,157 @@
+import argparse
+import json
+import math
+import random
+import time
+from collections import deque
+import constants
+import game_clock
+from asset_pack import AssetPack
+from engine import Game
+from game_input import InputState
+
+def aim_at_nearest(game, inputs, tick):
+  #shoot at the nearest enemy in range
+  target = None
+  target_dist = 400
+  for enemy in game.enemy_list:
+    if enemy.alive:
+      dist = math.dist(enemy.rect.center, game.player.rect.center)
+      if dist < target_dist:
+        target = enemy
+        target_dist = dist
+  if target:
+    #aim in screen coordinates and release the button between shots
+    inputs.mouse_pos = (target.rect.centerx - game.camera.x, target.rect.centery - game.camera.y)
+    inputs.mouse_pressed = tick % 20 < 10
+  else:
+    inputs.mouse_pressed = False
+
+#scripted players, each is called once per tick with the game and tick number and returns that tick's InputState
+class IdlePolicy():
+  def __init__(self, seed = 0):
+    self.inputs = InputState()
+
+  def __call__(self, game, tick):
+    return self.inputs
+
+
+class WanderPolicy():
+  #walk in a random direction that changes every half second and shoot at the nearest enemy in range
+  def __init__(self, seed = 0):
+    self.random = random.Random(seed)
+    self.inputs = InputState()
+
+  def __call__(self, game, tick):
+    inputs = self.inputs
+    if tick % 30 == 0:
+      inputs.moving_left, inputs.moving_right = self.random.choice([(True, False), (False, True), (False, False)])
+      inputs.moving_up, inputs.moving_down = self.random.choice([(True, False), (False, True), (False, False)])
+    aim_at_nearest(game, inputs, tick)
+    return inputs
+
+
+class ExitPolicy():
+  #walk the shortest path to the exit ladder and shoot at the nearest enemy on the way
+  def __init__(self, seed = 0):
+    self.random = random.Random(seed)
+    self.inputs = InputState()
+    self.world = None
+    self.distance = {}
+    #ticks since the player last got closer to the exit, and ticks left of random moves to get unstuck
+    self.stalled = 0
+    self.wiggle = 0
+    self.best = math.inf
+
+  def map_distances(self, world):
+    #steps from every cell to the exit, moving up, down, left or right
+    #the player only collides with walls, so empty map cells can be crossed too
+    grid = world.tile_grid
+    exit_cell = grid.cell(world.exit_tile[1].center)
+    self.distance = {exit_cell: 0}
+    queue = deque([exit_cell])
+    while queue:
+      x, y = queue.popleft()
+      for step_x, step_y in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        cell = (x + step_x, y + step_y)
+        if cell not in self.distance and 0 <= cell[0] < grid.cols and 0 <= cell[1] < grid.rows and not grid.is_wall(*cell):
+          self.distance[cell] = self.distance[(x, y)] + 1
+          queue.append(cell)
+    self.world = world
+    self.best = math.inf
+
+  def __call__(self, game, tick):
+    inputs = self.inputs
+    if game.world is not self.world:
+      self.map_distances(game.world)
+    #head for the centre of the neighbouring cell that is closest to the exit
+    center_x, center_y = game.player.rect.center
+    x, y = game.world.tile_grid.cell((center_x, center_y))
+    target = (x, y)
+    for cell in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+      if self.distance.get(cell, math.inf) < self.distance.get(target, math.inf):
+        target = cell
+    dx = target[0] * constants.TILE_SIZE - center_x
+    dy = target[1] * constants.TILE_SIZE - center_y
+    #steps are bigger than a pixel, so the player can end up just out of line with a corridor and caught on its corner
+    #when there's no progress for a second, move randomly for a few ticks to shake it loose
+    if self.distance.get((x, y), math.inf) < self.best:
+      self.best = self.distance[(x, y)]
+      self.stalled = 0
+    else:
+      self.stalled += 1
+    if self.stalled > constants.FPS:
+      self.stalled = 0
+      self.wiggle = self.random.randint(1, 6)
+    if self.wiggle:
+      self.wiggle -= 1
+      inputs.moving_left, inputs.moving_right = self.random.choice([(True, False), (False, True), (False, False)])
+      inputs.moving_up, inputs.moving_down = self.random.choice([(True, False), (False, True), (False, False)])
+    else:
+      inputs.moving_left = dx < 0
+      inputs.moving_right = dx > 0
+      inputs.moving_up = dy < 0
+      inputs.moving_down = dy > 0
+    aim_at_nearest(game, inputs, tick)
+    return inputs
+
+
+POLICIES = {"idle": IdlePolicy, "wander": WanderPolicy, "exit": ExitPolicy}
+
+def simulate(ticks, level = 1, policy = "wander", seed = 0, assets = None):
+  #run the game without a screen on a fixed timestep until the player dies, the game ends or ticks run out
+  random.seed(seed)
+  clock = game_clock.FixedClock(1000 / constants.FPS)
+  game_clock.set_source(clock)
+  try:
+    game = Game(assets or AssetPack(), level, prefetch = False, render = False)
+    player_policy = POLICIES[policy](seed) if isinstance(policy, str) else policy
+    start = time.perf_counter()
+    tick = 0
+    while tick < ticks and game.player.alive and not game.game_complete:
+      game.step(player_policy(game, tick))
+      clock.advance()
+      tick += 1
+    elapsed = time.perf_counter() - start
+    return {
+      "ticks": tick,
+      "level": game.level,
+      "game_complete": game.game_complete,
+      "alive": game.player.alive,
+      "health": game.player.health,
+      "score": game.player.score,
+      "enemies_left": sum(enemy.alive for enemy in game.enemy_list),
+      "seconds": elapsed,
+      "ticks_per_second": tick / elapsed if elapsed > 0 else 0,
+    }
+  finally:
+    game_clock.reset()
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description = "Run the game headless on a fixed timestep")
+  parser.add_argument("--ticks", type = int, default = 3600)
+  parser.add_argument("--level", type = int, default = 1)
+  parser.add_argument("--policy", choices = sorted(POLICIES), default = "wander")
+  parser.add_argument("--seed", type = int, default = 0)
+  args = parser.parse_args()
+  print(json.dumps(simulate(args.ticks, args.level, args.policy, args.seed), indent = 2))
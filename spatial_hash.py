@@ -0,0 +1,44 @@
+class SpatialHash():
+  #buckets objects by the grid cells their rect covers so lookups only touch nearby objects
+  def __init__(self, cell_size):
+    self.cell_size = cell_size
+    self.cells = {}
+    self.count = 0
+
+  def __len__(self):
+    return self.count
+
+  def cells_for(self, rect):
+    size = self.cell_size
+    for y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+      for x in range(rect.left // size, (rect.right - 1) // size + 1):
+        yield (x, y)
+
+  def add(self, obj):
+    #objects are bucketed by their rect when added, so they must not move afterwards
+    for cell in self.cells_for(obj.rect):
+      self.cells.setdefault(cell, []).append(obj)
+    self.count += 1
+
+  def remove(self, obj):
+    for cell in self.cells_for(obj.rect):
+      bucket = self.cells[cell]
+      bucket.remove(obj)
+      if not bucket:
+        del self.cells[cell]
+    self.count -= 1
+
+  def clear(self):
+    self.cells = {}
+    self.count = 0
+
+  def query(self, rect):
+    #objects in the cells the rect covers, each listed once, they still need an exact overlap test
+    found = {}
+    cells = self.cells
+    for cell in self.cells_for(rect):
+      bucket = cells.get(cell)
+      if bucket:
+        for obj in bucket:
+          found[obj] = None
+    return list(found)
@@ -0,0 +1,38 @@
+from collections import OrderedDict
+import constants
+
+class TextCache():
+  #rendered text surfaces keyed by (font, text, color), least recently used ones are dropped past the memory cap
+  #the surfaces are shared, so they must only be blitted and never drawn on
+  def __init__(self, max_bytes = constants.TEXT_CACHE_BYTES):
+    self.max_bytes = max_bytes
+    self.surfaces = OrderedDict()
+    self.bytes = 0
+
+  def __len__(self):
+    return len(self.surfaces)
+
+  def render(self, font, text, color, antialias = True):
+    key = (font, text, tuple(color), antialias)
+    image = self.surfaces.get(key)
+    if image is not None:
+      self.surfaces.move_to_end(key)
+      return image
+    image = font.render(text, antialias, color)
+    self.surfaces[key] = image
+    self.bytes += surface_bytes(image)
+    #always keep the newest surface, even if it's over the cap on its own
+    while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+      key, old_image = self.surfaces.popitem(last = False)
+      self.bytes -= surface_bytes(old_image)
+    return image
+
+  def clear(self):
+    self.surfaces.clear()
+    self.bytes = 0
+
+def surface_bytes(surface):
+  return surface.get_pitch() * surface.get_height()
+
+#cache shared by everything that draws text
+text_cache = TextCache()
@@ -0,0 +1,138 @@
+import numpy as np
+import constants
+
+class TileGrid():
+  def __init__(self, cols, rows):
+    self.cols = cols
+    self.rows = rows
+    #flat row-major list holding the rect of the wall in each cell, or None
+    self.walls = [None] * (cols * rows)
+    #the same walls as a (rows, cols) array for vectorised lookups
+    self.wall_mask = np.zeros((rows, cols), dtype = bool)
+    #flat row-major list of the cells enemies can walk on
+    self.walkable = [False] * (cols * rows)
+    #line of sight results for the current frame, keyed by (start cell, end cell)
+    self.los_cache = {}
+
+  def add_wall(self, x, y, rect):
+    self.walls[y * self.cols + x] = rect
+    self.wall_mask[y, x] = True
+
+  def add_floor(self, x, y):
+    self.walkable[y * self.cols + x] = True
+
+  def cell(self, pos):
+    #tile rects are centred on the grid point, so shift by half a tile to find the cell
+    return ((pos[0] + constants.TILE_SIZE // 2) // constants.TILE_SIZE, (pos[1] + constants.TILE_SIZE // 2) // constants.TILE_SIZE)
+
+  def is_wall(self, x, y):
+    if x < 0 or y < 0 or x >= self.cols or y >= self.rows:
+      return False
+    return self.walls[y * self.cols + x] is not None
+
+  def is_walkable(self, x, y):
+    if x < 0 or y < 0 or x >= self.cols or y >= self.rows:
+      return False
+    return self.walkable[y * self.cols + x]
+
+  def first_col(self, rect):
+    return max(0, (rect.left + constants.TILE_SIZE // 2) // constants.TILE_SIZE)
+
+  def last_col(self, rect):
+    return min(self.cols - 1, (rect.right - 1 + constants.TILE_SIZE // 2) // constants.TILE_SIZE)
+
+  def first_row(self, rect):
+    return max(0, (rect.top + constants.TILE_SIZE // 2) // constants.TILE_SIZE)
+
+  def last_row(self, rect):
+    return min(self.rows - 1, (rect.bottom - 1 + constants.TILE_SIZE // 2) // constants.TILE_SIZE)
+
+  def push_out_x(self, rect, dx):
+    #only the cells the rect overlaps are checked, in the same row-major order as the level data,
+    #and the column range is re-read as the rect is pushed so the results match a full scan
+    for y in range(self.first_row(rect), self.last_row(rect) + 1):
+      row = y * self.cols
+      x = self.first_col(rect)
+      while x <= self.last_col(rect):
+        wall = self.walls[row + x]
+        if wall is not None and wall.colliderect(rect):
+          #check which side the collision is from
+          if dx > 0:
+            rect.right = wall.left
+          if dx < 0:
+            rect.left = wall.right
+        x += 1
+
+  def push_out_y(self, rect, dy):
+    y = self.first_row(rect)
+    while y <= self.last_row(rect):
+      row = y * self.cols
+      for x in range(self.first_col(rect), self.last_col(rect) + 1):
+        wall = self.walls[row + x]
+        if wall is not None and wall.colliderect(rect):
+          #check which side the collision is from
+          if dy > 0:
+            rect.bottom = wall.top
+          if dy < 0:
+            rect.top = wall.bottom
+      y += 1
+
+  def clear_cache(self):
+    self.los_cache = {}
+
+  def line_of_sight(self, start, end, cached = False):
+    start_cell = self.cell(start)
+    end_cell = self.cell(end)
+    if not cached:
+      return self.march(start, end, start_cell, end_cell)
+    key = (start_cell, end_cell)
+    if key not in self.los_cache:
+      #cached results are shared by everything in the same pair of cells, so ray march between the cell centres
+      centre_start = (start_cell[0] * constants.TILE_SIZE, start_cell[1] * constants.TILE_SIZE)
+      centre_end = (end_cell[0] * constants.TILE_SIZE, end_cell[1] * constants.TILE_SIZE)
+      self.los_cache[key] = self.march(centre_start, centre_end, start_cell, end_cell)
+    return self.los_cache[key]
+
+  def march(self, start, end, start_cell, end_cell):
+    #walk the cells the segment passes through (Amanatides & Woo DDA) and stop at the first wall
+    x, y = start_cell
+    end_x, end_y = end_cell
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    #distance along the segment, as a fraction of its length, to the next cell boundary on each axis
+    half = constants.TILE_SIZE // 2
+    if dx != 0:
+      boundary_x = (x + (1 if dx > 0 else 0)) * constants.TILE_SIZE - half
+      t_max_x = (boundary_x - start[0]) / dx
+      t_delta_x = constants.TILE_SIZE / abs(dx)
+    else:
+      t_max_x = t_delta_x = float("inf")
+    if dy != 0:
+      boundary_y = (y + (1 if dy > 0 else 0)) * constants.TILE_SIZE - half
+      t_max_y = (boundary_y - start[1]) / dy
+      t_delta_y = constants.TILE_SIZE / abs(dy)
+    else:
+      t_max_y = t_delta_y = float("inf")
+
+    for _ in range(abs(end_x - x) + abs(end_y - y) + 1):
+      if self.is_wall(x, y):
+        return False
+      if x == end_x and y == end_y:
+        break
+      if t_max_x < t_max_y:
+        x += step_x
+        t_max_x += t_delta_x
+      elif t_max_y < t_max_x:
+        y += step_y
+        t_max_y += t_delta_y
+      else:
+        #the segment passes exactly through a corner, treat it as blocked if either side is a wall
+        if self.is_wall(x + step_x, y) or self.is_wall(x, y + step_y):
+          return False
+        x += step_x
+        y += step_y
+        t_max_x += t_delta_x
+        t_max_y += t_delta_y
+    return True
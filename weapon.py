@@ -1,123 +1,69 @@
-import pygame
 import math
-import random
 import constants
+import game_clock
+import projectiles
+from rotation_cache import RotationCache
 
 class Weapon():
   def __init__(self, image, arrow_image):
-    self.original_image = image
+    self.rotations = RotationCache(image)
     self.angle = 0
-    self.image = pygame.transform.rotate(self.original_image, self.angle)
-    self.arrow_image = arrow_image
+    self.image, self.offset = self.rotations.get(self.angle)
+    self.arrow_rotations = RotationCache(arrow_image)
     self.rect = self.image.get_rect()
     self.fired = False
-    self.last_shot = pygame.time.get_ticks()
+    self.last_shot = game_clock.get_ticks()
 
-  def update(self, player):
+  def update(self, player, camera, inputs):
     shot_cooldown = 300
     arrow = None
 
     self.rect.center = player.rect.center
 
-    pos = pygame.mouse.get_pos()
-    x_dist = pos[0] - self.rect.centerx
-    y_dist = -(pos[1] - self.rect.centery)#-ve because pygame y coordinates increase down the screen
+    #mouse position is in screen coordinates, so compare it against the bow's screen position
+    pos = inputs.mouse_pos
+    x_dist = pos[0] - (self.rect.centerx - camera.x)
+    y_dist = -(pos[1] - (self.rect.centery - camera.y))#-ve because pygame y coordinates increase down the screen
     self.angle = math.degrees(math.atan2(y_dist, x_dist))
 
     #get mouseclick
-    if pygame.mouse.get_pressed()[0] and self.fired == False and (pygame.time.get_ticks() - self.last_shot) >= shot_cooldown:
-      arrow = Arrow(self.arrow_image, self.rect.centerx, self.rect.centery, self.angle)
+    if inputs.mouse_pressed and self.fired == False and (game_clock.get_ticks() - self.last_shot) >= shot_cooldown:
+      arrow = Arrow(self.arrow_rotations, self.rect.centerx, self.rect.centery, self.angle)
       self.fired = True
-      self.last_shot = pygame.time.get_ticks()
+      self.last_shot = game_clock.get_ticks()
     #reset mouseclick
-    if pygame.mouse.get_pressed()[0] == False:
+    if inputs.mouse_pressed == False:
       self.fired = False
 
     return arrow
 
-  def draw(self, surface):
-    self.image = pygame.transform.rotate(self.original_image, self.angle)
-    surface.blit(self.image, ((self.rect.centerx - int(self.image.get_width()/2)), self.rect.centery - int(self.image.get_height()/2)))
+  def draw(self, surface, camera, shift = (0, 0)):
+    #shift moves the bow along with the player when the player is drawn between ticks
+    self.image, self.offset = self.rotations.get(self.angle)
+    return surface.blit(self.image, (self.rect.centerx - camera.x + self.offset[0] + shift[0], self.rect.centery - camera.y + self.offset[1] + shift[1]))
 
 
-class Arrow(pygame.sprite.Sprite):
-  def __init__(self, image, x, y, angle):
-    pygame.sprite.Sprite.__init__(self)
-    self.original_image = image
+class Arrow():
+  def __init__(self, rotations, x, y, angle):
+    self.owner = projectiles.OWNER_PLAYER
     self.angle = angle
-    self.image = pygame.transform.rotate(self.original_image, self.angle - 90)
+    self.image = rotations.get(self.angle - 90)[0]
     self.rect = self.image.get_rect()
     self.rect.center = (x, y)
     #calculate the horizontal and vertical speeds based on the angle
     self.dx = math.cos(math.radians(self.angle)) * constants.ARROW_SPEED
     self.dy = -(math.sin(math.radians(self.angle)) * constants.ARROW_SPEED)#-ve because pygame y coordinate increases down the screen
 
-  def update(self,screen_scroll, obstacle_tiles, enemy_list):
-    #reset variables
-    damage = 0
-    damage_pos = None
 
-    #reposition based on speed
-    self.rect.x += screen_scroll[0] + self.dx
-    self.rect.y += screen_scroll[1] + self.dy
-
-    #check for collision between arrow and tile walls
-    for obstacle in obstacle_tiles:
-      if obstacle[1].colliderect(self.rect):
-        self.kill()
-
-    #check if arrow has gone off screen
-    if self.rect.right < 0 or self.rect.left > constants.SCREEN_WIDTH or self.rect.bottom < 0 or self.rect.top > constants.SCREEN_HEIGHT:
-      self.kill()
-
-    #check collision between arrow and enemies
-    for enemy in enemy_list:
-      if enemy.rect.colliderect(self.rect) and enemy.alive:
-        damage = 10 + random.randint(-5, 5)
-        damage_pos = enemy.rect
-        enemy.health -= damage
-        enemy.hit = True
-        self.kill()
-        break
-
-    return damage, damage_pos
-
-  def draw(self, surface):
-    surface.blit(self.image, ((self.rect.centerx - int(self.image.get_width()/2)), self.rect.centery - int(self.image.get_height()/2)))
-
-
-
-class Fireball(pygame.sprite.Sprite):
-  def __init__(self, image, x, y, target_x, target_y):
-    pygame.sprite.Sprite.__init__(self)
-    self.original_image = image
+class Fireball():
+  def __init__(self, rotations, x, y, target_x, target_y):
+    self.owner = projectiles.OWNER_ENEMY
     x_dist = target_x - x
     y_dist = -(target_y - y)
     self.angle = math.degrees(math.atan2(y_dist, x_dist))
-    self.image = pygame.transform.rotate(self.original_image, self.angle - 90)
+    self.image = rotations.get(self.angle - 90)[0]
     self.rect = self.image.get_rect()
     self.rect.center = (x, y)
     #calculate the horizontal and vertical speeds based on the angle
     self.dx = math.cos(math.radians(self.angle)) * constants.FIREBALL_SPEED
     self.dy = -(math.sin(math.radians(self.angle)) * constants.FIREBALL_SPEED)#-ve because pygame y coordiate increases down the screen
-
-
-  def update(self, screen_scroll, player):
-    #reposition based on speed
-    self.rect.x += screen_scroll[0] + self.dx
-    self.rect.y += screen_scroll[1] + self.dy
-
-    #check if fireball has gone off screen
-    if self.rect.right < 0 or self.rect.left > constants.SCREEN_WIDTH or self.rect.bottom < 0 or self.rect.top > constants.SCREEN_HEIGHT:
-      self.kill()
-
-    #check collision between self and player
-    if player.rect.colliderect(self.rect) and player.hit == False:
-      player.hit = True
-      player.last_hit = pygame.time.get_ticks()
-      player.health -= 10
-      self.kill()
-
-
-  def draw(self, surface):
-    surface.blit(self.image, ((self.rect.centerx - int(self.image.get_width()/2)), self.rect.centery - int(self.image.get_height()/2)))
\ No newline at end of file
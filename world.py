@@ -1,18 +1,42 @@
+import pygame
+import numpy as np
+from collections import OrderedDict
 from character import Character
 from items import Item
+from entity_store import EntityStore
+from tile_grid import TileGrid
+from flow_field import FlowField
+from text_cache import surface_bytes
 import constants
 
 class World():
   def __init__(self):
     self.map_tiles = []
-    self.obstacle_tiles = []
     self.exit_tile = None
     self.item_list = []
     self.player = None
-    self.character_list = []
+    #enemies share one store, iterating it gives the Character views in level order
+    self.character_list = EntityStore()
+    #tiles to draw into each background chunk, keyed by (chunk_x, chunk_y)
+    self.chunk_tiles = {}
+    self.chunk_cols = 0
+    self.chunk_rows = 0
+    #chunks baked so far, least recently drawn first, dropped past CHUNK_CACHE_BYTES
+    self.chunks = OrderedDict()
+    self.chunk_bytes = 0
+    self.tile_grid = None
+    self.flow_field = None
 
-  def process_data(self, data, tile_list, item_images, mob_animations):
+  def process_data(self, data, assets, render = True):
+    tile_list = assets.tile_list
+    item_images = assets.item_images()
+    mob_animations = assets.mob_animations
+    mob_spawns = assets.mob_spawns
+    #level grids arrive as arrays, walk them as plain python ints
+    if isinstance(data, np.ndarray):
+      data = data.tolist()
     self.level_length = len(data)
+    self.tile_grid = TileGrid(max((len(row) for row in data), default = 0), len(data))
     #iterate through each value in level data file
     for y, row in enumerate(data):
       for x, tile in enumerate(row):
@@ -24,7 +48,7 @@ class World():
         tile_data = [image, image_rect, image_x, image_y]
         
         if tile == 7:
-          self.obstacle_tiles.append(tile_data)
+          self.tile_grid.add_wall(x, y, image_rect)
         elif tile == 8:
           self.exit_tile = tile_data
         elif tile == 9:
@@ -36,28 +60,86 @@ class World():
           self.item_list.append(potion)
           tile_data[0] = tile_list[0]
         elif tile == 11:
-          player = Character(image_x, image_y, 100, mob_animations, 0, False, 1)
+          player = Character(image_x, image_y, constants.PLAYER_HEALTH, mob_animations, 0, False, 1)
           self.player = player
           tile_data[0] = tile_list[0]
-        elif tile >= 12 and tile <= 16:
-          enemy = Character(image_x, image_y, 40, mob_animations, tile - 11, False, 1)
-          self.character_list.append(enemy)
-          tile_data[0] = tile_list[0]
-        elif tile == 17:
-          enemy = Character(image_x, image_y, 250, mob_animations, 6, True, 2)
-          self.character_list.append(enemy)
+        elif tile in mob_spawns:
+          #the manifest says which enemy each spawn tile makes
+          char_type, health, boss, size = assets.mob_spawn(tile)
+          Character(image_x, image_y, health, mob_animations, char_type, boss, size, self.character_list)
           tile_data[0] = tile_list[0]
 
         #add image data to main tiles list
         if tile >= 0:
           self.map_tiles.append(tile_data)
+          if tile != 7:
+            self.tile_grid.add_floor(x, y)
 
-  def update(self, screen_scroll):
-    for tile in self.map_tiles:
-      tile[2] += screen_scroll[0]
-      tile[3] += screen_scroll[1]
-      tile[1].center = (tile[2], tile[3])
+    self.flow_field = FlowField(self.tile_grid)
+    #simulations that never draw skip sorting tiles into chunks
+    if render:
+      self.index_chunks(data)
+
+  def start_timers(self, now):
+    #characters are made with the time the world was built, which for a prefetched world is a while before it's played
+    #so start their hit and attack timers again when the level starts, otherwise a boss could fire straight away
+    for store in (self.player.store, self.character_list):
+      store.column("last_hit")[:] = now
+      store.column("last_attack")[:] = now
 
-  def draw(self, surface):
+  def index_chunks(self, data):
+    #the static tiles are drawn from fixed size chunks so draw cost depends on screen size, not level size
+    #chunks are only baked once they come near the screen, so memory doesn't grow with level size
+    self.chunk_rows = -(-len(data) // constants.CHUNK_SIZE)
+    self.chunk_cols = -(-max((len(row) for row in data), default = 0) // constants.CHUNK_SIZE)
     for tile in self.map_tiles:
-      surface.blit(tile[0], tile[1])
\ No newline at end of file
+      #tile rects are centred on the grid point, so shift back by half a tile to get the grid cell
+      x = (tile[2] + constants.TILE_SIZE // 2) // constants.TILE_SIZE
+      y = (tile[3] + constants.TILE_SIZE // 2) // constants.TILE_SIZE
+      key = (x // constants.CHUNK_SIZE, y // constants.CHUNK_SIZE)
+      position = ((x % constants.CHUNK_SIZE) * constants.TILE_SIZE, (y % constants.CHUNK_SIZE) * constants.TILE_SIZE)
+      self.chunk_tiles.setdefault(key, []).append((tile[0], position))
+
+  def chunk(self, chunk_x, chunk_y):
+    #return the baked chunk, baking it if needed, or None if it has no tiles
+    key = (chunk_x, chunk_y)
+    chunk = self.chunks.get(key)
+    if chunk is not None:
+      self.chunks.move_to_end(key)
+      return chunk
+    tiles = self.chunk_tiles.get(key)
+    if tiles is None:
+      return None
+    chunk_px = constants.CHUNK_SIZE * constants.TILE_SIZE
+    #empty map cells are left as the background colour the screen is filled with
+    chunk = pygame.Surface((chunk_px, chunk_px))
+    chunk.fill(constants.BG)
+    chunk.blits(tiles, doreturn = False)
+    self.chunks[key] = chunk
+    self.chunk_bytes += surface_bytes(chunk)
+    #always keep the newest chunk, even if it's over the cap on its own
+    while self.chunk_bytes > constants.CHUNK_CACHE_BYTES and len(self.chunks) > 1:
+      old_key, old_chunk = self.chunks.popitem(last = False)
+      self.chunk_bytes -= surface_bytes(old_chunk)
+    return chunk
+
+  def draw(self, surface, camera):
+    chunk_px = constants.CHUNK_SIZE * constants.TILE_SIZE
+    #screen position of the top left corner of the first chunk
+    origin_x = -camera.x - constants.TILE_SIZE // 2
+    origin_y = -camera.y - constants.TILE_SIZE // 2
+    #only blit the chunks that overlap the screen
+    first_row = -origin_y // chunk_px
+    last_row = (surface.get_height() - 1 - origin_y) // chunk_px + 1
+    first_col = -origin_x // chunk_px
+    last_col = (surface.get_width() - 1 - origin_x) // chunk_px + 1
+    for chunk_y in range(max(0, first_row), min(self.chunk_rows, last_row)):
+      for chunk_x in range(max(0, first_col), min(self.chunk_cols, last_col)):
+        chunk = self.chunk(chunk_x, chunk_y)
+        if chunk is not None:
+          surface.blit(chunk, (origin_x + chunk_x * chunk_px, origin_y + chunk_y * chunk_px))
+    #bake the ring of chunks just off screen too, so scrolling into them doesn't stall a frame
+    for chunk_y in range(max(0, first_row - 1), min(self.chunk_rows, last_row + 1)):
+      for chunk_x in range(max(0, first_col - 1), min(self.chunk_cols, last_col + 1)):
+        if (chunk_x, chunk_y) not in self.chunks:
+          self.chunk(chunk_x, chunk_y)